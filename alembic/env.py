@@ -11,6 +11,7 @@ from asyncpg import Connection
 
 from app.models.base import Base
 from app.config import settings
+from app.services.log_partitions import DEFAULT_PARTITION, PARTITION_NAME
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -30,6 +31,13 @@ target_metadata = Base.metadata
 def get_url():
     return settings.database_config.DB_CONFIG[0]
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Partitions of service_logs are created and dropped by the log partition maintenance job
+    if type_ == "table" and reflected and (name == DEFAULT_PARTITION or PARTITION_NAME.match(name)):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -62,7 +71,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,67 @@
+"""Case-insensitive indexes for user lookups
+
+Revision ID: 3f1b9d7c2a64
+Revises: c9ff14da3bf2
+Create Date: 2026-10-18 10:12:41.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1b9d7c2a64'
+down_revision: Union[str, None] = 'c9ff14da3bf2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_case_duplicates(column: str) -> None:
+    # A unique index on lower(column) cannot be built while rows differ only by case
+    duplicates = op.get_bind().execute(
+        sa.text(
+            f"SELECT lower({column}) FROM service_users "
+            f"GROUP BY lower({column}) HAVING count(*) > 1 LIMIT 10"
+        )
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"service_users.{column} has values that differ only by case, "
+            f"resolve them before upgrading: {', '.join(duplicates)}"
+        )
+
+
+def upgrade() -> None:
+    _check_case_duplicates("username")
+    _check_case_duplicates("email")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_service_users_lower_username',
+            'service_users',
+            [sa.text('lower(username)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_service_users_lower_email',
+            'service_users',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+    op.drop_index('ix_service_users_username', table_name='service_users')
+    op.drop_index('ix_service_users_email', table_name='service_users')
+
+    # Expression indexes only get planner statistics after ANALYZE
+    op.execute("ANALYZE service_users")
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_service_users_email'), 'service_users', ['email'], unique=True)
+    op.create_index(op.f('ix_service_users_username'), 'service_users', ['username'], unique=True)
+    op.drop_index('ix_service_users_lower_email', table_name='service_users')
+    op.drop_index('ix_service_users_lower_username', table_name='service_users')
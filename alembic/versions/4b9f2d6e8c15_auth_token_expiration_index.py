@@ -0,0 +1,32 @@
+"""Index refresh tokens by expiration for the expired token sweeper
+
+Revision ID: 4b9f2d6e8c15
+Revises: 7c1d5e8a2f46
+Create Date: 2026-10-18 14:51:39.672018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9f2d6e8c15'
+down_revision: Union[str, None] = '7c1d5e8a2f46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_service_auth_tokens_expiration'),
+            'service_auth_tokens',
+            ['expiration'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_service_auth_tokens_expiration'), table_name='service_auth_tokens')
@@ -0,0 +1,39 @@
+"""Indexes for keyset pagination of receipts and receipt products
+
+Revision ID: 5d7e0b3f9c21
+Revises: 8a4c2e91d5b7
+Create Date: 2026-10-18 12:20:44.902617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7e0b3f9c21'
+down_revision: Union[str, None] = '8a4c2e91d5b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sales_receipts_user_id_created_at_id',
+            'sales_receipts',
+            ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_sales_receipt_products_receipt_id_id',
+            'sales_receipt_products',
+            ['receipt_id', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_receipt_products_receipt_id_id', table_name='sales_receipt_products')
+    op.drop_index('ix_sales_receipts_user_id_created_at_id', table_name='sales_receipts')
@@ -0,0 +1,39 @@
+"""Store refresh token secrets as SHA-256 digests
+
+Revision ID: 7c1d5e8a2f46
+Revises: e2c8f4a61b93
+Create Date: 2026-10-18 14:22:07.104395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d5e8a2f46'
+down_revision: Union[str, None] = 'e2c8f4a61b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('service_auth_tokens', sa.Column('secret_hash', sa.String(length=64), nullable=True))
+    op.execute("UPDATE service_auth_tokens SET secret_hash = encode(sha256(convert_to(secret, 'UTF8')), 'hex')")
+    op.alter_column('service_auth_tokens', 'secret_hash', nullable=False)
+    op.create_index(
+        op.f('ix_service_auth_tokens_secret_hash'), 'service_auth_tokens', ['secret_hash'], unique=True
+    )
+    op.drop_index(op.f('ix_service_auth_tokens_secret'), table_name='service_auth_tokens')
+    op.drop_column('service_auth_tokens', 'secret')
+
+
+def downgrade() -> None:
+    # The original secrets can't be recovered; the digests keep the column unique
+    op.add_column('service_auth_tokens', sa.Column('secret', sa.String(length=1024), nullable=True))
+    op.execute("UPDATE service_auth_tokens SET secret = secret_hash")
+    op.alter_column('service_auth_tokens', 'secret', nullable=False)
+    op.create_index(op.f('ix_service_auth_tokens_secret'), 'service_auth_tokens', ['secret'], unique=True)
+    op.drop_index(op.f('ix_service_auth_tokens_secret_hash'), table_name='service_auth_tokens')
+    op.drop_column('service_auth_tokens', 'secret_hash')
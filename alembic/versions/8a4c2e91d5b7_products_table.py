@@ -0,0 +1,39 @@
+"""Products table and sales_receipt_products.product_id
+
+Revision ID: 8a4c2e91d5b7
+Revises: 3f1b9d7c2a64
+Create Date: 2026-10-18 11:02:09.530114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4c2e91d5b7'
+down_revision: Union[str, None] = '3f1b9d7c2a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('products',
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('sales_receipt_products', sa.Column('product_id', sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        'sales_receipt_products_product_id_fkey',
+        'sales_receipt_products', 'products',
+        ['product_id'], ['id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('sales_receipt_products_product_id_fkey', 'sales_receipt_products', type_='foreignkey')
+    op.drop_column('sales_receipt_products', 'product_id')
+    op.drop_table('products')
@@ -0,0 +1,86 @@
+"""Partition service_logs by month of created
+
+Revision ID: 9e4a7b2c6d80
+Revises: 4b9f2d6e8c15
+Create Date: 2026-10-18 15:34:52.219760
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7b2c6d80'
+down_revision: Union[str, None] = '4b9f2d6e8c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month; the maintenance job keeps this up afterwards
+MONTHS_AHEAD = 3
+
+
+def _create_service_logs(**kwargs) -> None:
+    op.create_table('service_logs',
+    sa.Column('log_type', sa.String(length=64), nullable=False),
+    sa.Column('target_id', sa.Uuid(), nullable=True),
+    sa.Column('created', sa.DateTime(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['service_users.id'], name='service_logs_user_id_fkey'),
+    sa.PrimaryKeyConstraint(*kwargs.pop('primary_key')),
+    **kwargs
+    )
+    op.create_index(op.f('ix_service_logs_created'), 'service_logs', ['created'], unique=False)
+    op.create_index(op.f('ix_service_logs_log_type'), 'service_logs', ['log_type'], unique=False)
+
+
+def _rename_to_legacy() -> None:
+    op.drop_index(op.f('ix_service_logs_log_type'), table_name='service_logs')
+    op.drop_index(op.f('ix_service_logs_created'), table_name='service_logs')
+    op.rename_table('service_logs', 'service_logs_legacy')
+    op.execute("ALTER TABLE service_logs_legacy RENAME CONSTRAINT service_logs_pkey TO service_logs_legacy_pkey")
+
+
+def upgrade() -> None:
+    _rename_to_legacy()
+    _create_service_logs(primary_key=['id', 'created'], postgresql_partition_by='RANGE (created)')
+    op.execute("CREATE TABLE service_logs_default PARTITION OF service_logs DEFAULT")
+
+    # One partition per month from the oldest log to MONTHS_AHEAD months from now
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce((SELECT min(created) FROM service_logs_legacy), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF service_logs FOR VALUES FROM (%L) TO (%L)',
+                    'service_logs_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+    op.execute(
+        "INSERT INTO service_logs (log_type, target_id, created, data, user_id, id) "
+        "SELECT log_type, target_id, created, data, user_id, id FROM service_logs_legacy"
+    )
+    op.drop_table('service_logs_legacy')
+
+
+def downgrade() -> None:
+    _rename_to_legacy()
+    _create_service_logs(primary_key=['id'])
+    op.execute(
+        "INSERT INTO service_logs (log_type, target_id, created, data, user_id, id) "
+        "SELECT log_type, target_id, created, data, user_id, id FROM service_logs_legacy"
+    )
+    op.drop_table('service_logs_legacy')
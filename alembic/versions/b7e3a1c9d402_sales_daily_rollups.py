@@ -0,0 +1,71 @@
+"""Daily sales and payment rollups
+
+Revision ID: b7e3a1c9d402
+Revises: 5d7e0b3f9c21
+Create Date: 2026-10-18 13:05:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3a1c9d402'
+down_revision: Union[str, None] = '5d7e0b3f9c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sales_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('receipts_count', sa.Integer(), nullable=False),
+    sa.Column('products_count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['service_users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', name='uq_sales_daily_rollups_user_id_day')
+    )
+    op.create_table('payment_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('payment_type', postgresql.ENUM('cash', 'card', name='paymenttype', create_type=False), nullable=False),
+    sa.Column('payments_count', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['service_users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'day', 'payment_type', name='uq_payment_daily_rollups_user_id_day_payment_type')
+    )
+
+    op.execute("""
+        INSERT INTO sales_daily_rollups (id, user_id, day, receipts_count, products_count, total)
+        SELECT gen_random_uuid(), r.user_id, r.created_at::date, count(*),
+               coalesce(sum(p.products_count), 0), coalesce(sum(p.total), 0)
+        FROM sales_receipts r
+        LEFT JOIN (
+            SELECT receipt_id, count(*) AS products_count, sum(total) AS total
+            FROM sales_receipt_products
+            GROUP BY receipt_id
+        ) p ON p.receipt_id = r.id
+        WHERE r.user_id IS NOT NULL
+        GROUP BY r.user_id, r.created_at::date
+    """)
+    op.execute("""
+        INSERT INTO payment_daily_rollups (id, user_id, day, payment_type, payments_count, amount)
+        SELECT gen_random_uuid(), r.user_id, r.created_at::date, p.payment_type, count(*), sum(p.amount)
+        FROM payments p
+        JOIN sales_receipts r ON r.id = p.receipt_id
+        WHERE r.user_id IS NOT NULL
+        GROUP BY r.user_id, r.created_at::date, p.payment_type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('payment_daily_rollups')
+    op.drop_table('sales_daily_rollups')
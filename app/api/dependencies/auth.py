@@ -3,17 +3,18 @@ from fastapi import HTTPException, Request
 
 from app.schemas.auth import Signup, LoginArgs, LoginValidationResult
 from app.models.user import User
-from app.crud.user import get_user_by_username, get_user_by_email
+from app.crud.user import get_user_by_email, check_user_unique
 from app.errors import Abort
 from app.constants import ACCESS_TOKEN_TYPE
-from app.utils.auth import verify_password, is_protected_username, utc_now
-from app.services.auth import check_auth_user_from_token_by_payload, get_token_payload
+from app.utils.auth import is_protected_username, utc_now
+from app.services.auth import check_auth_user_from_token_by_payload, get_token_payload, get_request_access_token
+from app.services.password import verify_password_async
 
 from .user import CurrentUserDep
 from .core import DBSessionDep
 
 
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
 
 
 async def validate_is_authenticated(current_user: CurrentUserDep) -> User:
@@ -35,18 +36,11 @@ async def validate_signup(signup: Signup, db_session: DBSessionDep) -> Signup:
         HTTPException: If the username is invalid, already exists,
             or if the email already exists.
     """
-    logging.debug(f"Validating signup data: {signup}")
     if is_protected_username(signup.username):
-        logging.debug(f"Invalid username detected: {signup.username}")
+        logger.debug("Invalid username detected: %s", signup.username)
         raise HTTPException(status_code=400, detail="Invalid username")
 
-    if await get_user_by_username(db_session, signup.username):
-        logging.debug(f"Username already exists: {signup.username}")
-        raise HTTPException(status_code=400, detail="Username already exists")
-
-    if await get_user_by_email(db_session, signup.email):
-        logging.debug(f"Email already    exists: {signup.email}")
-        raise HTTPException(status_code=400, detail="Email already exists")
+    await check_user_unique(db_session, signup.username, signup.email)
 
     return signup
 
@@ -59,17 +53,15 @@ async def validate_login(
     if not (user := await get_user_by_email(db_session, login.email)):
         raise HTTPException(status_code=401, detail="user-not-found")
 
-    if not verify_password(login.password, user.hashed_password):
+    if not await verify_password_async(login.password, user.hashed_password):
         raise Abort("auth", "invalid-password")
 
     refresh_token_id = None
 
-    access_token = request.session.get("access_token")
+    access_token = get_request_access_token(request)
     if access_token:
         payload = get_token_payload(token=access_token, check_expired_token=False)
-        print(payload)
         refresh_token_id = payload.get("refresh_token_id")
-        print(refresh_token_id)
         # if not check_auth_user_from_token_by_payload(ACCESS_TOKEN_TYPE, login.email, payload):
         #     root_logger.warning(f"Invalid access token for user {login.email}. Refresh token ID: {refresh_token_id}")
 
@@ -83,8 +75,6 @@ def validate_password_reset(
         current_user: CurrentUserDep
 ) -> User:
     if current_user.password_reset_expire:
-
-        print(utc_now(), current_user.password_reset_expire)
         if utc_now() > current_user.password_reset_expire:
             raise Abort("auth", "reset-valid")
 
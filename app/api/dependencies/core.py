@@ -1,7 +1,11 @@
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db_session
+from app.database import get_db_session, get_db_read_session
 
 DBSessionDep = Annotated[AsyncSession, Depends(get_db_session)]
+# Possibly stale by up to DatabaseReplicas.max_lag seconds, for routes that don't write
+DBReadSessionDep = Annotated[AsyncSession, Depends(get_db_read_session)]
+
+IdempotencyKeyDep = Annotated[str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)]
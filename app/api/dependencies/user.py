@@ -1,3 +1,4 @@
+import logging
 from typing import Annotated
 from fastapi import Depends, HTTPException, status, Request
 
@@ -5,12 +6,14 @@ from fastapi import Depends, HTTPException, status, Request
 from app import models
 from app.constants import ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
 from app.api.dependencies.core import DBSessionDep
-from app.crud.user import get_user_by_email, get_admin_user_by_email
+from app.crud.user import get_cached_user_by_email
 from app.schemas.auth import TokenData
 from app.schemas.user import CurrentUserDataWithRefreshTokenID
 from app.services.auth import get_access_token, get_email_from_token_payload, get_token_payload
 from app.errors import credentials_exception
 
+logger = logging.getLogger(__name__)
+
 
 async def get_current_user(token: Annotated[str, Depends(get_access_token)], db_session: DBSessionDep) -> models.User:
     try:
@@ -19,7 +22,7 @@ async def get_current_user(token: Annotated[str, Depends(get_access_token)], db_
     except Exception as e:
         raise credentials_exception
 
-    user = await get_user_by_email(db_session, token_data.email)
+    user = await get_cached_user_by_email(db_session, token_data.email)
     if user is None:
         raise credentials_exception
 
@@ -36,10 +39,10 @@ async def get_current_user_with_refresh_token_id(token: Annotated[str, Depends(g
         email = payload.get("sub")
         token_data = TokenData(email=email)
     except Exception as e:
-        print(e)
+        logger.debug("Invalid access token: %s", e)
         raise credentials_exception
 
-    user = await get_user_by_email(db_session, email)
+    user = await get_cached_user_by_email(db_session, email)
     if user is None:
         raise credentials_exception
 
@@ -56,8 +59,8 @@ async def get_admin_user(token: Annotated[str, Depends(get_access_token)], db_se
     except Exception as e:
         raise credentials_exception
 
-    user = await get_admin_user_by_email(db_session, token_data.email)
-    if user is None:
+    user = await get_cached_user_by_email(db_session, token_data.email)
+    if user is None or user.role != "admin":
         raise credentials_exception
 
     return user
@@ -0,0 +1,128 @@
+import logging
+import random
+import time
+
+from starlette import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import RequestLogging
+from app.database import track_queries
+from app.services.metrics import http_requests, http_request_duration, http_requests_in_flight
+from app.utils.auth import parse_bearer_token
+
+logger = logging.getLogger("app.requests")
+
+
+class RequestLoggingMiddleware:
+    """
+    Log one structured record per request with its route, status and duration.
+
+    Successful requests are sampled per route template; errors are always
+    logged. Unhandled exceptions are turned into a 400 response with the
+    exception message, as the application has always done.
+
+    The SQL statements run for the request are counted and timed through the
+    engine event hooks. They are reported in a ``Server-Timing`` header and
+    in the log record, and requests over the route's query budget are
+    flagged and always logged. Request counts, latency histograms and the
+    in-flight gauge for ``/metrics`` are recorded here as well.
+    """
+
+    def __init__(self, app: ASGIApp, config: RequestLogging):
+        self.app = app
+        self.sample_rate = config.sample_rate
+        self.route_sample_rates = config.route_sample_rates
+        self.query_budget = config.query_budget
+        self.route_query_budgets = config.route_query_budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        response_started = False
+        error = None
+        method = scope["method"]
+        http_requests_in_flight.inc(method)
+
+        with track_queries() as queries:
+            async def send_wrapper(message: Message):
+                nonlocal status_code, response_started
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    response_started = True
+                    MutableHeaders(scope=message).append("Server-Timing", (
+                        f'db;dur={queries.seconds * 1000:.3f};desc="{queries.queries} queries", '
+                        f"app;dur={(time.perf_counter() - start) * 1000:.3f}"
+                    ))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as exc:
+                if response_started:
+                    raise
+                error = exc
+                response = JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"detail": str(exc)},
+                )
+                await response(scope, receive, send_wrapper)
+            finally:
+                duration = time.perf_counter() - start
+                duration_ms = duration * 1000
+                route = scope.get("route")
+                route_path = route.path if route is not None else scope["path"]
+
+                # Unmatched paths share one label so scans can't blow up the series count
+                route_label = route.path if route is not None else "unmatched"
+                http_requests_in_flight.dec(method)
+                http_requests.inc(method, route_label, str(status_code))
+                http_request_duration.observe(duration, method, route_label)
+                over_budget = queries.queries > self.route_query_budgets.get(route_path, self.query_budget)
+
+                if error is not None or status_code >= 500 or over_budget or self._sampled(route_path):
+                    fields = {
+                        "method": method,
+                        "route": route_path,
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        "duration_ms": round(duration_ms, 3),
+                        "db_queries": queries.queries,
+                        "db_commits": queries.commits,
+                        "db_ms": round(queries.seconds * 1000, 3),
+                        "over_query_budget": over_budget,
+                    }
+                    if error is not None:
+                        logger.error("request failed: %s", error, extra=fields, exc_info=error)
+                    elif over_budget:
+                        logger.warning("request over query budget", extra=fields)
+                    else:
+                        logger.info("request", extra=fields)
+
+    def _sampled(self, route_path: str) -> bool:
+        rate = self.route_sample_rates.get(route_path, self.sample_rate)
+        return rate >= 1 or random.random() < rate
+
+
+class BearerSessionMiddleware(SessionMiddleware):
+    """
+    Session cookie middleware that steps aside for bearer-authenticated requests.
+
+    A request with an ``Authorization: Bearer`` header gets a fresh empty
+    session: the cookie is neither verified nor decoded, and no Set-Cookie is
+    written for the response. Cookie-based clients are handled as before.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and parse_bearer_token(Headers(scope=scope).get("authorization")):
+            scope["session"] = {}
+            await self.app(scope, receive, send)
+            return
+
+        await super().__call__(scope, receive, send)
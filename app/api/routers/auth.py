@@ -17,6 +17,8 @@ from app.models.user import User
 from app.constants import REFRESH_TOKEN_TYPE
 from app.services.auth import create_access_token, create_refresh_token, get_token_payload, validate_token_type
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
@@ -36,7 +38,7 @@ async def signup(
 
     request.session["access_token"] = access_token
 
-    await create_log(db_session, "signup", user)
+    create_log("signup", user, db_session=db_session)
 
     return {
         "user_id": user.id,
@@ -62,7 +64,7 @@ async def login(
     access_token = create_access_token(user, refresh_token)
     request.session["access_token"] = access_token
 
-    await create_log(db_session, "login", user)
+    create_log("login", user, db_session=db_session)
 
     return TokenInfo(access_token=access_token)
 
@@ -79,9 +81,9 @@ async def logout(
     refresh_token_id = refresh_data.refresh_token_id
 
     await delete_refresh_auth_token(db_session, user, refresh_token_id)
-    del request.session["access_token"]
+    request.session.pop("access_token", None)
 
-    await create_log(db_session, "refresh", None)
+    create_log("refresh", None, db_session=db_session)
     return "Logout successful"
 
 
@@ -97,11 +99,11 @@ async def auth_refresh_token(
         refresh_token = await update_refresh_auth_token(db_session, refresh_data.user, refresh_data.refresh_token_id)
         access_token = create_access_token(refresh_data.user, refresh_token)
     except Exception as e:
-        print(e)
+        logger.debug("Refresh token rotation failed: %s", e)
         raise HTTPException(status_code=401, detail="Invalid refresh token.")
 
     request.session["access_token"] = access_token
 
-    await create_log(db_session, "refresh", refresh_data.user)
+    create_log("refresh", refresh_data.user, db_session=db_session)
 
     return access_token
\ No newline at end of file
@@ -0,0 +1,74 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Query
+
+from app.api.dependencies.core import DBSessionDep, DBReadSessionDep
+from app.api.dependencies.user import CurrentUserDep, CurrentAdminDep
+from app.crud.product import (create_product, update_product, delete_product, get_product,
+                              get_products_page)
+from app.schemas.product import CreateProduct, UpdateProduct, ProductDetails, ProductPage
+from app.utils.pagination import encode_cursor, decode_cursor
+
+router = APIRouter(
+    prefix="/api/products",
+    tags=["products"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get(
+    "",
+    response_model=ProductPage
+)
+async def list_products(
+        current_user: CurrentUserDep,
+        db_session: DBReadSessionDep,
+        limit: int = Query(100, ge=1, le=500),
+        cursor: str | None = None
+):
+    after_id = decode_cursor(cursor, UUID)[0] if cursor else None
+    products = await get_products_page(db_session, limit + 1, after_id)
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1].id)
+
+    return ProductPage(items=products, next_cursor=next_cursor)
+
+
+@router.get(
+    "/{product_id}",
+    response_model=ProductDetails
+)
+async def product_details(product_id: UUID, current_user: CurrentUserDep, db_session: DBSessionDep):
+    return await get_product(db_session, product_id)
+
+
+@router.post(
+    "",
+    response_model=ProductDetails
+)
+async def add_product(product_in: CreateProduct, current_admin: CurrentAdminDep, db_session: DBSessionDep):
+    return await create_product(db_session, product_in)
+
+
+@router.patch(
+    "/{product_id}",
+    response_model=ProductDetails
+)
+async def change_product(
+        product_id: UUID,
+        product_in: UpdateProduct,
+        current_admin: CurrentAdminDep,
+        db_session: DBSessionDep
+):
+    return await update_product(db_session, product_id, product_in)
+
+
+@router.delete(
+    "/{product_id}"
+)
+async def remove_product(product_id: UUID, current_admin: CurrentAdminDep, db_session: DBSessionDep):
+    await delete_product(db_session, product_id)
+    return {"Success": True}
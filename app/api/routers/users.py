@@ -1,17 +1,31 @@
+from datetime import datetime, date, timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request, HTTPException
-from typing import Annotated, List
+from fastapi import APIRouter, Depends, Request, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Annotated, List, Literal
 
 from app.api.dependencies.auth import validate_is_authenticated, validate_password_reset
 from app.api.dependencies.user import CurrentUserDep, CurrentAdminDep
-from app.api.dependencies.core import DBSessionDep
+from app.api.dependencies.core import DBSessionDep, DBReadSessionDep, IdempotencyKeyDep
 from app.crud.log import create_log
-from app.crud.sales_receipt import create_sales_receipt
-from app.crud.sales_receipt_products import create_sales_receipt_product
+from app.database import sessionmanager
+from app.crud.payment import create_payment
+from app.crud.sales_receipt import (create_sales_receipt, create_sales_receipt_with_products,
+                                    get_inconsistent_receipts, get_sales_receipts_page, stream_sales_receipts)
+from app.crud.sales_receipt_products import create_sales_receipt_product, get_sales_receipt_products_page
+from app.crud.sales_rollup import get_sales_rollups
 from app.crud.user import (update_user_profile, create_password_token, create_new_password)
-from app.schemas.sales_receipt import CreateSalesReceipt
-from app.schemas.sales_receipt_products import CreateSalesReceiptProduct
+from app.schemas.sales_receipt import (CreateSalesReceipt, CreateSalesReceiptWithProducts, SalesReceiptDetails,
+                                       SalesReceiptPage)
+from app.schemas.analytics import SalesAnalytics, DailySales, PaymentTypeSales
+from app.schemas.payment import AddPayment, PaymentDetails
+from app.schemas.sales_receipt_products import (AddSalesReceiptProduct, SalesReceiptProductDetails,
+                                                SalesReceiptProductPage)
+from app.services.export import receipts_to_ndjson, receipts_to_csv
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.utils.auth import utc_now
+from app.utils.pagination import encode_cursor, decode_cursor
 
 from app.schemas.user import (User, AuthorizedUser, UpdateProfile, ResetPasswordArgs)
 
@@ -26,8 +40,8 @@ router = APIRouter(
     "/me",
     response_model=AuthorizedUser
 )
-async def user_details(current_user: CurrentUserDep, db_session: DBSessionDep):
-    await create_log(db_session, "me", current_user)
+async def user_details(current_user: CurrentUserDep):
+    create_log("me", current_user)
     return current_user
 
 
@@ -40,13 +54,12 @@ async def change_profile(
         current_user: CurrentUserDep,
         db_session: DBSessionDep
 ):
-    print(profile_update)
     try:
         updated_user = await update_user_profile(db_session, current_user, profile_update)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    await create_log(db_session, "change_profile", current_user)
+    create_log("change_profile", current_user, db_session=db_session)
     return updated_user
 
 
@@ -58,7 +71,7 @@ async def make_password_reset_token(
         db_session: DBSessionDep
 ):
     user = await create_password_token(db_session, current_user)
-    await create_log(db_session, "make_password_reset_token", current_user)
+    create_log("make_password_reset_token", current_user, db_session=db_session)
     return "Create success new password token"
 
 
@@ -72,7 +85,7 @@ async def reset_password(
 ):
     user = await create_new_password(db_session, current_user, reset_password_args)
 
-    await create_log(db_session, "reset_password", current_user)
+    create_log("reset_password", current_user, db_session=db_session)
 
     return {"Success": True}
 
@@ -84,17 +97,177 @@ async def reset_password(
 async def user_details(current_admin: CurrentAdminDep):
     return current_admin
 
+
+@router.get(
+    "/admin/db_pool"
+)
+async def db_pool_stats(current_admin: CurrentAdminDep):
+    return {**sessionmanager.pool_stats(), "replicas": sessionmanager.replica_stats()}
+
 @router.post("/receipt")
-async def create_receipt(current_user: CurrentUserDep, db_session: DBSessionDep):
-    new_receipt = await create_sales_receipt(db_session, current_user.id)
+async def create_receipt(
+        current_user: CurrentUserDep,
+        db_session: DBSessionDep,
+        response: Response,
+        idempotency_key: IdempotencyKeyDep = None
+):
+    new_receipt, replayed = await idempotency_store.run(
+        db_session,
+        current_user.id,
+        idempotency_key,
+        request_fingerprint("POST /api/users/receipt"),
+        lambda: create_sales_receipt(db_session, current_user.id),
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     return new_receipt
 
 
-@router.post("/product")
-async def create_product(
+@router.get(
+    "/receipts",
+    response_model=SalesReceiptPage
+)
+async def list_receipts(
+        current_user: CurrentUserDep,
+        db_session: DBReadSessionDep,
+        limit: int = Query(50, ge=1, le=500),
+        cursor: str | None = None
+):
+    after = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor else None
+    receipts = await get_sales_receipts_page(db_session, current_user.id, limit + 1, after)
+
+    next_cursor = None
+    if len(receipts) > limit:
+        receipts = receipts[:limit]
+        next_cursor = encode_cursor(receipts[-1].created_at.isoformat(), receipts[-1].id)
+
+    return SalesReceiptPage(items=receipts, next_cursor=next_cursor)
+
+
+@router.get(
+    "/receipts/export"
+)
+async def export_receipts(
+        current_user: CurrentUserDep,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        format: Literal["ndjson", "csv"] = "ndjson"
+):
+    user_id = current_user.id
+    render, media_type = {
+        "ndjson": (receipts_to_ndjson, "application/x-ndjson"),
+        "csv": (receipts_to_csv, "text/csv"),
+    }[format]
+
+    async def content():
+        # The request session is closed before the body is sent, so the export uses its own
+        async with sessionmanager.read_session() as session:
+            async for chunk in render(stream_sales_receipts(session, user_id, start, end)):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="receipts.{format}"'},
+    )
+
+
+@router.get(
+    "/receipts/{receipt_id}/products",
+    response_model=SalesReceiptProductPage
+)
+async def list_receipt_products(
+        receipt_id: UUID,
         current_user: CurrentUserDep,
-        product: CreateSalesReceiptProduct,
+        db_session: DBReadSessionDep,
+        limit: int = Query(100, ge=1, le=500),
+        cursor: str | None = None
+):
+    after_id = decode_cursor(cursor, UUID)[0] if cursor else None
+    products = await get_sales_receipt_products_page(db_session, receipt_id, current_user.id, limit + 1, after_id)
+
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_cursor(products[-1].id)
+
+    return SalesReceiptProductPage(items=products, next_cursor=next_cursor)
+
+
+@router.post(
+    "/receipt/bulk",
+    response_model=SalesReceiptDetails
+)
+async def create_receipt_with_products(
+        current_user: CurrentUserDep,
+        receipt_in: CreateSalesReceiptWithProducts,
         db_session: DBSessionDep
 ):
-    new_product = await create_sales_receipt_product(db_session, product, UUID("ae897f62-de4f-4059-ae5f-f83e315f7c7d"))
+    new_receipt = await create_sales_receipt_with_products(db_session, current_user.id, receipt_in)
+    return new_receipt
+
+
+@router.post(
+    "/product",
+    response_model=SalesReceiptProductDetails
+)
+async def create_product(
+        current_user: CurrentUserDep,
+        product: AddSalesReceiptProduct,
+        db_session: DBSessionDep,
+        response: Response,
+        idempotency_key: IdempotencyKeyDep = None
+):
+    new_product, replayed = await idempotency_store.run(
+        db_session,
+        current_user.id,
+        idempotency_key,
+        request_fingerprint("POST /api/users/product", product),
+        lambda: create_sales_receipt_product(db_session, product, product.receipt_id, current_user.id),
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     return new_product
+
+
+@router.post(
+    "/payment",
+    response_model=PaymentDetails
+)
+async def add_payment(
+        current_user: CurrentUserDep,
+        payment: AddPayment,
+        db_session: DBSessionDep
+):
+    new_payment = await create_payment(db_session, payment, payment.receipt_id, current_user.id)
+    return new_payment
+
+
+@router.get(
+    "/analytics/sales",
+    response_model=SalesAnalytics
+)
+async def sales_analytics(
+        current_user: CurrentUserDep,
+        db_session: DBReadSessionDep,
+        start: date | None = None,
+        end: date | None = None
+):
+    end = end or utc_now().date()
+    start = start or end - timedelta(days=29)
+
+    sales, payments = await get_sales_rollups(db_session, current_user.id, start, end)
+
+    days = {rollup.day: DailySales.model_validate(rollup, from_attributes=True) for rollup in sales}
+    for rollup in payments:
+        day = days.setdefault(rollup.day, DailySales(day=rollup.day))
+        day.payments.append(PaymentTypeSales.model_validate(rollup, from_attributes=True))
+
+    return SalesAnalytics(start=start, end=end, days=sorted(days.values(), key=lambda item: item.day))
+
+
+@router.get(
+    "/admin/receipts/consistency"
+)
+async def receipts_consistency(current_admin: CurrentAdminDep, db_session: DBReadSessionDep):
+    return await get_inconsistent_receipts(db_session)
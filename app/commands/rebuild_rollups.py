@@ -0,0 +1,32 @@
+"""
+Recompute the sales and payment rollups from the receipt tables.
+
+Usage:
+    python -m app.commands.rebuild_rollups [--since YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.config import settings
+from app.crud.sales_rollup import rebuild_sales_rollups
+from app.database import sessionmanager
+
+
+async def main(since: date | None):
+    sessionmanager.init(settings.database_config.DB_CONFIG[0])
+    try:
+        async with sessionmanager.session() as session:
+            sales_rows, payment_rows = await rebuild_sales_rollups(session, since)
+    finally:
+        await sessionmanager.close()
+
+    print(f"Rebuilt {sales_rows} sales rollups and {payment_rows} payment rollups")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, help="first receipt day to rebuild")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.since))
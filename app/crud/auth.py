@@ -1,15 +1,38 @@
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from datetime import timedelta
 from typing import Optional
 
 from app.models import User as DBModelUser
 from app.models import AuthToken
-from app.services.auth import create_refresh_token
+from app.services.auth import new_token, hash_refresh_token
 from app.utils.auth import utc_now
 from app.errors import TokenInvalidError
 
 
+def _parse_token_id(token_id: str | UUID | None) -> UUID | None:
+    if token_id is None or isinstance(token_id, UUID):
+        return token_id
+    try:
+        return UUID(token_id)
+    except ValueError:
+        return None
+
+
+def _new_token_values() -> dict:
+    # Only the digest is stored and the client never sees the secret, so a random value does
+    now = utc_now()
+    return {
+        "secret_hash": hash_refresh_token(new_token()),
+        "expiration": now + timedelta(days=15),
+        "created": now,
+    }
+
+
 async def create_refresh_auth_token(db_session: AsyncSession, user: DBModelUser) -> AuthToken:
     """
     Create a new refresh auth token for current user
@@ -20,23 +43,14 @@ async def create_refresh_auth_token(db_session: AsyncSession, user: DBModelUser)
 
     :return: Refresh auth token
     """
-    now = utc_now()
-    secret = create_refresh_token(user)
-    expiration_time = now + timedelta(days=15)
-
-
     token = AuthToken(
-        **{
-            "secret": secret,
-            "expiration": expiration_time,
-            "created": now,
-            "user": user,
-            "token_type": "refresh",
-        }
+        **_new_token_values(),
+        user=user,
+        token_type="refresh",
     )
 
     db_session.add(token)
-    await db_session.commit()
+    await db_session.flush()
 
     return token
 
@@ -81,58 +95,127 @@ async def get_refresh_auth_token_without_user(db_session: AsyncSession, token_id
 
 async def update_refresh_auth_token(db_session: AsyncSession, user: DBModelUser, token_id: str) -> AuthToken:
     """
-        Update an existing refresh auth token by its ID.
+        Rotate an existing refresh auth token by its ID with a single UPDATE ... RETURNING.
 
         :param db_session: Asynchronous database session.
         :param user: The user who owns the token.
         :param token_id: ID of the token to be updated.
 
         :return: Updated AuthToken object.
-        :raises HTTPException: If the token is not found or does not belong to the user.
+        :raises TokenInvalidError: If the token is not found or does not belong to the user.
     """
-
-    token = await get_refresh_auth_token(db_session, user, token_id)
+    stmt = (
+        update(AuthToken)
+        .where(
+            AuthToken.id == _parse_token_id(token_id),
+            AuthToken.user_id == user.id,
+            AuthToken.token_type == "refresh"
+        )
+        .values(**_new_token_values())
+        .returning(AuthToken)
+        .execution_options(populate_existing=True)
+    )
+    token = await db_session.scalar(stmt)
 
     if not token:
         raise TokenInvalidError(f"Token with ID {token_id} not found or does not belong to user {user.id}")
 
-    now = utc_now()
-    token.secret = create_refresh_token(user)
-    token.expiration = now + timedelta(days=15)
-    token.created = now
+    return token
 
-    await db_session.commit()
 
-    return token
+async def delete_refresh_auth_token(db_session: AsyncSession, user: DBModelUser, token_id: str):
+    deleted_id = await db_session.scalar(
+        delete(AuthToken)
+        .where(
+            AuthToken.id == _parse_token_id(token_id),
+            AuthToken.user_id == user.id,
+            AuthToken.token_type == "refresh"
+        )
+        .returning(AuthToken.id)
+    )
 
+    if not deleted_id:
+        raise HTTPException(status_code=404, detail="Refresh token not found or does not belong to the user.")
 
-async def delete_refresh_auth_token(db_session: AsyncSession, user: DBModelUser, token_id: str) -> AuthToken:
-    token = await get_refresh_auth_token(db_session, user, token_id)
 
-    if not token:
+async def delete_refresh_auth_token_without_user(db_session: AsyncSession, token_id: str):
+    deleted_id = await db_session.scalar(
+        delete(AuthToken)
+        .where(AuthToken.id == _parse_token_id(token_id), AuthToken.token_type == "refresh")
+        .returning(AuthToken.id)
+    )
+
+    if not deleted_id:
         raise HTTPException(status_code=404, detail="Refresh token not found or does not belong to the user.")
 
-    await db_session.delete(token)
-    await db_session.commit()
 
+async def delete_expired_auth_tokens(db_session: AsyncSession, batch_size: int) -> int:
+    """
+    Delete up to ``batch_size`` expired tokens and commit.
 
-async def delete_refresh_auth_token_without_user(db_session: AsyncSession, token_id: str) -> AuthToken:
-    token = await get_refresh_auth_token_without_user(db_session, token_id)
+    Rows locked by a concurrent rotation or logout are skipped, so the batch
+    never waits on request traffic.
 
-    if not token:
-        raise HTTPException(status_code=404, detail="Refresh token not found or does not belong to the user.")
+    :param db_session: Asynchronous database session.
+    :param batch_size: Maximum number of tokens to delete.
 
-    await db_session.delete(token)
+    :return: Number of deleted tokens.
+    """
+    expired = (
+        select(AuthToken.id)
+        .where(AuthToken.expiration < utc_now())
+        .order_by(AuthToken.expiration)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db_session.scalars(
+        delete(AuthToken).where(AuthToken.id.in_(expired.scalar_subquery())).returning(AuthToken.id)
+    )
+    deleted = len(result.all())
     await db_session.commit()
 
+    return deleted
+
+
+async def _upsert_refresh_auth_token(db_session: AsyncSession, user: DBModelUser, token_id: UUID) -> AuthToken | None:
+    stmt = pg_insert(AuthToken).values(
+        id=token_id,
+        user_id=user.id,
+        token_type="refresh",
+        **_new_token_values(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AuthToken.id],
+        set_={
+            "secret_hash": stmt.excluded.secret_hash,
+            "expiration": stmt.excluded.expiration,
+            "created": stmt.excluded.created,
+        },
+        where=(AuthToken.user_id == stmt.excluded.user_id) & (AuthToken.token_type == "refresh"),
+    )
+    return await db_session.scalar(stmt.returning(AuthToken).execution_options(populate_existing=True))
+
 
 async def handle_refresh_token(
     db_session: AsyncSession, user: DBModelUser, refresh_token_id: Optional[str]
 ) -> AuthToken:
-    if not refresh_token_id:
-        return await create_refresh_auth_token(db_session, user)
-    try:
-        return await update_refresh_auth_token(db_session, user, refresh_token_id)
-    except TokenInvalidError:
-        await delete_refresh_auth_token_without_user(db_session, refresh_token_id)
-        return await create_refresh_auth_token(db_session, user)
\ No newline at end of file
+    """
+    Rotate the user's refresh token on login, or create one if there is none.
+
+    The token is upserted by ID with one INSERT ... ON CONFLICT DO UPDATE, so an
+    existing token of the same user is rotated in place and a missing one is
+    recreated under the same ID. Only when the ID belongs to another user is a
+    second statement needed, to insert a token with a fresh ID.
+
+    :param db_session: Asynchronous database session.
+    :param user: The user logging in.
+    :param refresh_token_id: Refresh token ID from the previous access token, if any.
+
+    :return: The rotated or created token.
+    """
+    token = await _upsert_refresh_auth_token(db_session, user, _parse_token_id(refresh_token_id) or uuid4())
+    if token is None:
+        # The ID belongs to another user's token
+        token = await _upsert_refresh_auth_token(db_session, user, uuid4())
+
+    return token
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, update, delete, null
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IdempotencyKey
+from app.utils.auth import utc_now
+
+
+async def claim_idempotency_key(
+        db_session: AsyncSession,
+        user_id: UUID,
+        key: str,
+        fingerprint: str,
+        lock_timeout: float
+) -> UUID | None:
+    """
+    Claim the user's idempotency key for a new request and commit the claim.
+
+    A new key is inserted; an existing key is only taken over if it has
+    expired, whether it was completed or abandoned by a crashed request.
+    Each claim gets a new row ID, so a request whose claim was taken over
+    can't complete the key.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the user who sent the key.
+    :param key: The Idempotency-Key header value.
+    :param fingerprint: Hash of the request the key is used for.
+    :param lock_timeout: Seconds before another request may take the key over.
+
+    :return: ID of the claim, or None if another request holds the key.
+    """
+    now = utc_now()
+    stmt = pg_insert(IdempotencyKey).values(
+        id=uuid4(),
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        response=null(),
+        created_at=now,
+        expires_at=now + timedelta(seconds=lock_timeout),
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_idempotency_keys_user_id_key",
+        set_={
+            "id": stmt.excluded.id,
+            "fingerprint": stmt.excluded.fingerprint,
+            "response": null(),
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at < now,
+    ).returning(IdempotencyKey.id)
+
+    claim_id = await db_session.scalar(stmt)
+    await db_session.commit()
+    return claim_id
+
+
+async def get_idempotency_key(db_session: AsyncSession, user_id: UUID, key: str) -> IdempotencyKey | None:
+    # Polled while another request holds the key, so don't reuse a loaded instance
+    return await db_session.scalar(
+        select(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def complete_idempotency_key(db_session: AsyncSession, claim_id: UUID, response, ttl: float) -> bool:
+    """
+    Store the response of a claimed key in the current transaction.
+
+    Run it in the transaction of the write, so the write and its response
+    are committed together or not at all.
+
+    :param db_session: Asynchronous database session.
+    :param claim_id: Result of :func:`claim_idempotency_key`.
+    :param response: JSON-compatible response body.
+    :param ttl: Seconds the response is replayed for.
+
+    :return: False if the claim expired and was taken over or purged meanwhile.
+    """
+    completed_id = await db_session.scalar(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.id == claim_id, IdempotencyKey.response.is_(None))
+        .values(response=response, expires_at=utc_now() + timedelta(seconds=ttl))
+        .returning(IdempotencyKey.id)
+    )
+    return completed_id is not None
+
+
+async def release_idempotency_key(db_session: AsyncSession, claim_id: UUID):
+    """
+    Delete a claim that has no response yet and commit, so a retry can run the request again.
+
+    A claim that was taken over meanwhile has another ID and is kept.
+
+    :param db_session: Asynchronous database session.
+    :param claim_id: Result of :func:`claim_idempotency_key`.
+    """
+    await db_session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.id == claim_id, IdempotencyKey.response.is_(None))
+    )
+    await db_session.commit()
+
+
+async def delete_expired_idempotency_keys(db_session: AsyncSession, batch_size: int) -> int:
+    """
+    Delete up to ``batch_size`` expired idempotency keys and commit.
+
+    :param db_session: Asynchronous database session.
+    :param batch_size: Maximum number of keys to delete.
+
+    :return: Number of deleted keys.
+    """
+    expired = (
+        select(IdempotencyKey.id)
+        .where(IdempotencyKey.expires_at < utc_now())
+        .order_by(IdempotencyKey.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db_session.scalars(
+        delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery())).returning(IdempotencyKey.id)
+    )
+    deleted = len(result.all())
+    await db_session.commit()
+
+    return deleted
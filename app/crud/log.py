@@ -1,31 +1,48 @@
+from functools import partial
+from uuid import UUID, uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
 
+from app.database import after_commit
 from app.models import User as DBModelUser
-from app.models.log import Log
+from app.services.log import log_sink
 from app.utils.auth import utc_now
 
 
-async def create_log(
-        session: AsyncSession,
+def create_log(
         log_type: str,
         user: DBModelUser | None,
         target_id: UUID | None = None,
-        data: dict = None
-):
-    now = utc_now()
-
-    log = Log(
-        **{
-            "created": now,
-            "target_id": target_id,
-            "log_type": log_type,
-            "user": user,
-            "data": data,
-        }
-    )
-
-    session.add(log)
-    await session.commit()
-
-    return log
\ No newline at end of file
+        data: dict = None,
+        db_session: AsyncSession | None = None
+) -> dict:
+    """
+    Queue a service log entry.
+
+    The entry is written to ``service_logs`` in a batch by the log sink,
+    so the caller does not pay for a database round trip.
+
+    :param log_type: Type of the logged event.
+    :param user: The user who performed the action, if any.
+    :param target_id: ID of the object the action was performed on.
+    :param data: Additional data for the entry.
+    :param db_session: Session of the logged write; the entry is only queued
+        once its transaction commits, so it never refers to rows that don't exist.
+
+    :return: The queued entry.
+    """
+    entry = {
+        "id": uuid4(),
+        "created": utc_now(),
+        "target_id": target_id,
+        "log_type": log_type,
+        "user_id": user.id if user else None,
+        "data": data or {},
+    }
+
+    if db_session is None:
+        log_sink.enqueue(entry)
+    else:
+        after_commit(db_session, partial(log_sink.enqueue, entry))
+
+    return entry
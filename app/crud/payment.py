@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.sales_receipt import apply_receipt_totals_delta
+from app.crud.sales_rollup import add_to_payment_rollup
+from app.models import Payment
+from app.schemas.payment import CreatePayment
+from app.utils.auth import utc_now
+
+
+async def create_payment(
+        db_session: AsyncSession,
+        create_payment_args: CreatePayment,
+        receipt_id: UUID,
+        user_id: UUID
+) -> Payment:
+    receipt_created_at = await apply_receipt_totals_delta(
+        db_session, receipt_id, user_id, paid_delta=create_payment_args.amount
+    )
+    await add_to_payment_rollup(
+        db_session,
+        user_id,
+        receipt_created_at.date(),
+        {create_payment_args.payment_type: (1, create_payment_args.amount)},
+    )
+
+    new_payment = Payment(
+        payment_type=create_payment_args.payment_type,
+        amount=create_payment_args.amount,
+        created_at=utc_now(),
+        receipt_id=receipt_id,
+    )
+
+    db_session.add(new_payment)
+    await db_session.flush()
+    return new_payment
@@ -0,0 +1,133 @@
+from functools import partial
+from types import MappingProxyType
+from typing import Iterable, List, Mapping
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import after_commit
+from app.models import Products
+from app.schemas.product import CreateProduct, UpdateProduct
+from app.utils.cache import TTLCache
+
+# Catalog snapshots (id, title, price) keyed by product ID
+product_cache = TTLCache(max_size=settings.product_cache.max_size, ttl=settings.product_cache.ttl)
+
+# Bumped on every catalog write. A read-through only stores what it loaded if
+# no write happened meanwhile, so a slow read can't put back a stale product.
+_catalog_version = 0
+
+
+def _product_snapshot(product: Products) -> Mapping:
+    return MappingProxyType({"id": product.id, "title": product.title, "price": product.price})
+
+
+def invalidate_cached_products(*product_ids: UUID):
+    global _catalog_version
+    _catalog_version += 1
+    for product_id in product_ids:
+        product_cache.pop(product_id)
+
+
+async def get_cached_products(db_session: AsyncSession, product_ids: Iterable[UUID]) -> dict[UUID, Mapping]:
+    """
+    Get catalog snapshots of the given products, loading all cache misses with one SELECT.
+
+    :param db_session: Asynchronous database session.
+    :param product_ids: IDs of the products, duplicates allowed.
+
+    :return: Snapshots by product ID.
+
+    :raises HTTPException: 404 if any of the products does not exist.
+    """
+    products, missing = {}, set()
+    for product_id in product_ids:
+        snapshot = product_cache.get(product_id)
+        if snapshot is None:
+            missing.add(product_id)
+        else:
+            products[product_id] = snapshot
+
+    if missing:
+        version = _catalog_version
+        result = await db_session.scalars(select(Products).where(Products.id.in_(missing)))
+        for product in result:
+            snapshot = _product_snapshot(product)
+            products[product.id] = snapshot
+            if version == _catalog_version:
+                product_cache.set(product.id, snapshot)
+
+        unknown = missing - products.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Products not found: {', '.join(sorted(map(str, unknown)))}"
+            )
+
+    return products
+
+
+async def get_products_page(
+        db_session: AsyncSession,
+        limit: int,
+        after_id: UUID | None = None
+) -> List[Products]:
+    """
+    Get catalog products ordered by ID, starting after the given ID.
+
+    :param db_session: Asynchronous database session.
+    :param limit: Maximum number of products.
+    :param after_id: ID of the last product of the previous page.
+
+    :return: Products of the page.
+    """
+    stmt = select(Products)
+    if after_id is not None:
+        stmt = stmt.where(Products.id > after_id)
+
+    result = await db_session.scalars(stmt.order_by(Products.id).limit(limit))
+    return list(result)
+
+
+async def get_product(db_session: AsyncSession, product_id: UUID) -> Mapping:
+    products = await get_cached_products(db_session, [product_id])
+    return products[product_id]
+
+
+async def create_product(db_session: AsyncSession, product_in: CreateProduct) -> Products:
+    new_product = Products(title=product_in.title, price=product_in.price)
+
+    db_session.add(new_product)
+    await db_session.flush()
+    after_commit(db_session, partial(invalidate_cached_products, new_product.id))
+    return new_product
+
+
+async def update_product(db_session: AsyncSession, product_id: UUID, product_in: UpdateProduct) -> Products:
+    product = await db_session.get(Products, product_id)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    for key, value in product_in.model_dump(exclude_unset=True, exclude_none=True).items():
+        setattr(product, key, value)
+
+    await db_session.flush()
+    after_commit(db_session, partial(invalidate_cached_products, product_id))
+    return product
+
+
+async def delete_product(db_session: AsyncSession, product_id: UUID):
+    try:
+        deleted_id = await db_session.scalar(
+            delete(Products).where(Products.id == product_id).returning(Products.id)
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Product is used in receipts")
+
+    after_commit(db_session, partial(invalidate_cached_products, product_id))
+    if deleted_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
@@ -1,11 +1,28 @@
-from sqlalchemy import select
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from fastapi import HTTPException
+from sqlalchemy import select, insert, update, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import UUID
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 
-from app.models import SalesReceipt
-from app.schemas.sales_receipt import CreateSalesReceipt
+from app.crud.product import get_cached_products
+from app.crud.sales_rollup import add_to_sales_rollup, add_to_payment_rollup
+from app.models import SalesReceipt, SalesReceiptProducts, Payment
+from app.schemas.sales_receipt import CreateSalesReceipt, CreateSalesReceiptWithProducts
 from app.utils.auth import utc_now
 
+CENT = Decimal("0.01")
+
+
+def line_total(price: Decimal, quantity: Decimal) -> Decimal:
+    """
+    Total of a receipt line, rounded to cents like PostgreSQL rounds it into the ``Numeric(10, 2)`` column.
+    """
+    return (price * quantity).quantize(CENT, rounding=ROUND_HALF_UP)
+
 
 async def create_sales_receipt(
         db_session: AsyncSession,
@@ -20,5 +37,234 @@ async def create_sales_receipt(
     )
 
     db_session.add(new_receipt)
-    await db_session.commit()
-    return new_receipt
\ No newline at end of file
+    await add_to_sales_rollup(db_session, user_id, now.date(), receipts_count=1)
+    await db_session.flush()
+    return new_receipt
+
+
+async def get_sales_receipts_page(
+        db_session: AsyncSession,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None
+) -> list[SalesReceipt]:
+    """
+    Get the user's receipts, newest first, starting after the given sort key.
+
+    Served by the (user_id, created_at, id) index, so the cost of a page does
+    not depend on how deep into the list it is.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the receipts owner.
+    :param limit: Maximum number of receipts.
+    :param after: (created_at, id) of the last receipt of the previous page.
+
+    :return: Receipts of the page.
+    """
+    stmt = select(SalesReceipt).where(SalesReceipt.user_id == user_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(SalesReceipt.created_at, SalesReceipt.id) < tuple_(*after))
+
+    stmt = stmt.order_by(SalesReceipt.created_at.desc(), SalesReceipt.id.desc()).limit(limit)
+    result = await db_session.scalars(stmt)
+    return list(result)
+
+
+async def stream_sales_receipts(
+        db_session: AsyncSession,
+        user_id: UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 500
+) -> AsyncIterator[SalesReceipt]:
+    """
+    Iterate over the user's receipts with their products and payments loaded.
+
+    Rows are read from a server-side cursor ``batch_size`` receipts at a time,
+    and products and payments are loaded per batch, so memory use does not
+    depend on the size of the date range.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the receipts owner.
+    :param start: Include receipts created at or after this time.
+    :param end: Include receipts created before this time.
+    :param batch_size: Number of receipts fetched per round trip.
+
+    :return: Async iterator over receipts, oldest first.
+    """
+    stmt = select(SalesReceipt).where(SalesReceipt.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(SalesReceipt.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(SalesReceipt.created_at < end)
+
+    stmt = (
+        stmt.order_by(SalesReceipt.created_at, SalesReceipt.id)
+        .options(selectinload(SalesReceipt.sales_receipt_products), selectinload(SalesReceipt.payments))
+        .execution_options(yield_per=batch_size)
+    )
+
+    result = await db_session.stream_scalars(stmt)
+    async for receipt in result:
+        yield receipt
+
+
+async def apply_receipt_totals_delta(
+        db_session: AsyncSession,
+        receipt_id: UUID,
+        user_id: UUID,
+        total_delta: Decimal = Decimal(0),
+        paid_delta: Decimal = Decimal(0),
+) -> datetime:
+    """
+    Adjust the stored total and rest of the user's receipt in the current transaction.
+
+    ``rest`` is the amount paid minus the total, so a new product lowers it and
+    a new payment raises it. The UPDATE also locks the receipt row until commit,
+    which keeps concurrent writes to the same receipt consistent.
+
+    :param db_session: Asynchronous database session.
+    :param receipt_id: ID of the receipt.
+    :param user_id: ID of the receipt owner.
+    :param total_delta: Amount added to the receipt total.
+    :param paid_delta: Amount added to the paid sum.
+
+    :return: Creation time of the receipt.
+    :raises HTTPException: If the receipt does not exist or belongs to another user.
+    """
+    created_at = await db_session.scalar(
+        update(SalesReceipt)
+        .where(SalesReceipt.id == receipt_id, SalesReceipt.user_id == user_id)
+        .values(
+            total=SalesReceipt.total + total_delta,
+            rest=SalesReceipt.rest + paid_delta - total_delta,
+        )
+        .returning(SalesReceipt.created_at)
+    )
+
+    if created_at is None:
+        raise HTTPException(status_code=404, detail="Receipt not found")
+
+    return created_at
+
+
+async def get_inconsistent_receipts(db_session: AsyncSession, limit: int = 100) -> list[dict]:
+    """
+    Find receipts whose stored total or rest differ from their products and payments.
+
+    :param db_session: Asynchronous database session.
+    :param limit: Maximum number of receipts to return.
+
+    :return: Stored and recomputed values of the mismatching receipts.
+    """
+    products_total = (
+        select(func.coalesce(func.sum(SalesReceiptProducts.total), 0))
+        .where(SalesReceiptProducts.receipt_id == SalesReceipt.id)
+        .scalar_subquery()
+    )
+    paid = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.receipt_id == SalesReceipt.id)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(
+            SalesReceipt.id,
+            SalesReceipt.total,
+            SalesReceipt.rest,
+            products_total.label("expected_total"),
+            (paid - products_total).label("expected_rest"),
+        )
+        .where((SalesReceipt.total != products_total) | (SalesReceipt.rest != paid - products_total))
+        .limit(limit)
+    )
+    result = await db_session.execute(stmt)
+    return [dict(row) for row in result.mappings()]
+
+
+async def create_sales_receipt_with_products(
+        db_session: AsyncSession,
+        user_id: UUID,
+        receipt_in: CreateSalesReceiptWithProducts
+) -> SalesReceipt:
+    """
+    Create a receipt together with all of its products and payments.
+
+    Everything is written in one transaction; the products and the payments
+    are each sent as a single multi-row INSERT. Lines for catalog products
+    take their title and price from the product cache, which loads all of its
+    misses for the basket with one SELECT.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the cashier who owns the receipt.
+    :param receipt_in: Receipt products and payments.
+
+    :return: The created receipt with its products and payments set.
+    """
+    now = utc_now()
+    receipt_id = uuid4()
+
+    catalog = await get_cached_products(
+        db_session, {product.product_id for product in receipt_in.products if product.product_id is not None}
+    )
+
+    products = []
+    for product in receipt_in.products:
+        title, price = product.title, product.price
+        if product.product_id is not None:
+            snapshot = catalog[product.product_id]
+            title, price = snapshot["title"], snapshot["price"]
+
+        products.append({
+            "id": uuid4(),
+            "title": title,
+            "price": price,
+            "quantity": product.quantity,
+            "total": line_total(price, product.quantity),
+            "product_id": product.product_id,
+            "receipt_id": receipt_id,
+        })
+    payments = [
+        {
+            "id": uuid4(),
+            "payment_type": payment.payment_type,
+            "amount": payment.amount,
+            "created_at": now,
+            "receipt_id": receipt_id,
+        }
+        for payment in receipt_in.payments
+    ]
+
+    total = sum((product["total"] for product in products), Decimal(0))
+    paid = sum((payment["amount"] for payment in payments), Decimal(0))
+
+    new_receipt = SalesReceipt(
+        id=receipt_id,
+        total=total,
+        rest=paid - total,
+        created_at=now,
+        user_id=user_id,
+    )
+    db_session.add(new_receipt)
+    await db_session.flush()
+
+    await db_session.execute(insert(SalesReceiptProducts).values(products))
+    if payments:
+        await db_session.execute(insert(Payment).values(payments))
+
+    payment_amounts = {}
+    for payment in payments:
+        count, amount = payment_amounts.get(payment["payment_type"], (0, Decimal(0)))
+        payment_amounts[payment["payment_type"]] = (count + 1, amount + payment["amount"])
+
+    await add_to_sales_rollup(
+        db_session, user_id, now.date(), receipts_count=1, products_count=len(products), total=total
+    )
+    await add_to_payment_rollup(db_session, user_id, now.date(), payment_amounts)
+
+    set_committed_value(
+        new_receipt, "sales_receipt_products", [SalesReceiptProducts(**product) for product in products]
+    )
+    set_committed_value(new_receipt, "payments", [Payment(**payment) for payment in payments])
+    return new_receipt
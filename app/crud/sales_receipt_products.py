@@ -4,7 +4,10 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import SalesReceiptProducts
+from app.crud.product import get_cached_products
+from app.crud.sales_receipt import apply_receipt_totals_delta, line_total
+from app.crud.sales_rollup import add_to_sales_rollup
+from app.models import SalesReceipt, SalesReceiptProducts
 from app.schemas.sales_receipt_products import CreateSalesReceiptProduct
 
 
@@ -16,6 +19,40 @@ async def get_all_sales_receipt_products(db_session: AsyncSession) -> List[Sales
     return sales_receipt_products
 
 
+async def get_sales_receipt_products_page(
+        db_session: AsyncSession,
+        receipt_id: UUID,
+        user_id: UUID,
+        limit: int,
+        after_id: UUID | None = None
+) -> List[SalesReceiptProducts]:
+    """
+    Get products of the user's receipt ordered by ID, starting after the given ID.
+
+    :param db_session: Asynchronous database session.
+    :param receipt_id: ID of the receipt.
+    :param user_id: ID of the receipt owner.
+    :param limit: Maximum number of products.
+    :param after_id: ID of the last product of the previous page.
+
+    :return: Products of the page; empty if the receipt belongs to another user.
+    """
+    stmt = (
+        select(SalesReceiptProducts)
+        .join(SalesReceipt, SalesReceipt.id == SalesReceiptProducts.receipt_id)
+        .where(
+            SalesReceiptProducts.receipt_id == receipt_id,
+            SalesReceipt.user_id == user_id,
+        )
+    )
+    if after_id is not None:
+        stmt = stmt.where(SalesReceiptProducts.id > after_id)
+
+    stmt = stmt.order_by(SalesReceiptProducts.id).limit(limit)
+    result = await db_session.scalars(stmt)
+    return list(result)
+
+
 async def get_sales_receipt_product(db_session: AsyncSession, user_id: UUID) -> SalesReceiptProducts:
     return await db_session.scalar(
         select(SalesReceiptProducts).filter(SalesReceiptProducts.id == user_id)
@@ -25,18 +62,29 @@ async def get_sales_receipt_product(db_session: AsyncSession, user_id: UUID) ->
 async def create_sales_receipt_product(
         db_session: AsyncSession,
         create_sl_product: CreateSalesReceiptProduct,
-        receipt_id: UUID
+        receipt_id: UUID,
+        user_id: UUID
 ) -> SalesReceiptProducts:
-    total_slr = create_sl_product.price * create_sl_product.quantity
+    title, price = create_sl_product.title, create_sl_product.price
+    if create_sl_product.product_id is not None:
+        products = await get_cached_products(db_session, [create_sl_product.product_id])
+        snapshot = products[create_sl_product.product_id]
+        title, price = snapshot["title"], snapshot["price"]
+
+    total_slr = line_total(price, create_sl_product.quantity)
+
+    receipt_created_at = await apply_receipt_totals_delta(db_session, receipt_id, user_id, total_delta=total_slr)
+    await add_to_sales_rollup(db_session, user_id, receipt_created_at.date(), products_count=1, total=total_slr)
 
     new_product = SalesReceiptProducts(
-        title=create_sl_product.title,
-        price=create_sl_product.price,
+        title=title,
+        price=price,
         quantity=create_sl_product.quantity,
         total=total_slr,
+        product_id=create_sl_product.product_id,
         receipt_id=receipt_id
     )
 
     db_session.add(new_product)
-    await db_session.commit()
-    return new_product
\ No newline at end of file
+    await db_session.flush()
+    return new_product
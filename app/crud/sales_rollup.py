@@ -0,0 +1,196 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, delete, insert, func, cast, Date, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import SalesReceipt, SalesReceiptProducts, Payment, SalesDailyRollup, PaymentDailyRollup
+from app.models.enums.payment import PaymentType
+
+
+async def add_to_sales_rollup(
+        db_session: AsyncSession,
+        user_id: UUID,
+        day: date,
+        receipts_count: int = 0,
+        products_count: int = 0,
+        total: Decimal = Decimal(0)
+):
+    """
+    Add receipt figures to the cashier's daily sales rollup in the current transaction.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the cashier.
+    :param day: Day the receipt was created.
+    :param receipts_count: Number of new receipts.
+    :param products_count: Number of new receipt products.
+    :param total: Sum of the new products' totals.
+    """
+    stmt = pg_insert(SalesDailyRollup).values(
+        id=uuid4(),
+        user_id=user_id,
+        day=day,
+        receipts_count=receipts_count,
+        products_count=products_count,
+        total=total,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sales_daily_rollups_user_id_day",
+        set_={
+            "receipts_count": SalesDailyRollup.receipts_count + stmt.excluded.receipts_count,
+            "products_count": SalesDailyRollup.products_count + stmt.excluded.products_count,
+            "total": SalesDailyRollup.total + stmt.excluded.total,
+        },
+    )
+    await db_session.execute(stmt)
+
+
+async def add_to_payment_rollup(
+        db_session: AsyncSession,
+        user_id: UUID,
+        day: date,
+        amounts: dict[PaymentType, tuple[int, Decimal]]
+):
+    """
+    Add payments to the cashier's daily payment rollups in the current transaction.
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the cashier.
+    :param day: Day the receipt was created.
+    :param amounts: Number of payments and their sum per payment type.
+    """
+    if not amounts:
+        return
+
+    stmt = pg_insert(PaymentDailyRollup).values([
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "day": day,
+            "payment_type": payment_type,
+            "payments_count": count,
+            "amount": amount,
+        }
+        for payment_type, (count, amount) in amounts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_payment_daily_rollups_user_id_day_payment_type",
+        set_={
+            "payments_count": PaymentDailyRollup.payments_count + stmt.excluded.payments_count,
+            "amount": PaymentDailyRollup.amount + stmt.excluded.amount,
+        },
+    )
+    await db_session.execute(stmt)
+
+
+async def get_sales_rollups(
+        db_session: AsyncSession,
+        user_id: UUID,
+        start: date,
+        end: date
+) -> tuple[list[SalesDailyRollup], list[PaymentDailyRollup]]:
+    """
+    Get the cashier's daily sales and payment rollups for days in [start, end].
+
+    :param db_session: Asynchronous database session.
+    :param user_id: ID of the cashier.
+    :param start: First day.
+    :param end: Last day.
+
+    :return: Sales rollups and payment rollups ordered by day.
+    """
+    sales = await db_session.scalars(
+        select(SalesDailyRollup)
+        .where(SalesDailyRollup.user_id == user_id, SalesDailyRollup.day.between(start, end))
+        .order_by(SalesDailyRollup.day)
+    )
+    payments = await db_session.scalars(
+        select(PaymentDailyRollup)
+        .where(PaymentDailyRollup.user_id == user_id, PaymentDailyRollup.day.between(start, end))
+        .order_by(PaymentDailyRollup.day, PaymentDailyRollup.payment_type)
+    )
+    return list(sales), list(payments)
+
+
+async def rebuild_sales_rollups(db_session: AsyncSession, since: date | None = None) -> tuple[int, int]:
+    """
+    Recompute the rollups from the receipt tables for receipt days since the given day.
+
+    The rollup tables are locked against concurrent writes until commit, so
+    receipts written while the rebuild runs are neither lost nor counted twice.
+
+    :param db_session: Asynchronous database session.
+    :param since: First day to rebuild; everything when None.
+
+    :return: Number of sales rollup rows and payment rollup rows written.
+    """
+    await db_session.execute(
+        text("LOCK TABLE sales_daily_rollups, payment_daily_rollups IN EXCLUSIVE MODE")
+    )
+
+    receipt_day = cast(SalesReceipt.created_at, Date)
+
+    delete_sales = delete(SalesDailyRollup)
+    delete_payments = delete(PaymentDailyRollup)
+    if since is not None:
+        delete_sales = delete_sales.where(SalesDailyRollup.day >= since)
+        delete_payments = delete_payments.where(PaymentDailyRollup.day >= since)
+    await db_session.execute(delete_sales)
+    await db_session.execute(delete_payments)
+
+    products = (
+        select(
+            SalesReceiptProducts.receipt_id,
+            func.count().label("products_count"),
+            func.sum(SalesReceiptProducts.total).label("total"),
+        )
+        .group_by(SalesReceiptProducts.receipt_id)
+        .subquery()
+    )
+    sales = (
+        select(
+            func.gen_random_uuid(),
+            SalesReceipt.user_id,
+            receipt_day,
+            func.count(),
+            func.coalesce(func.sum(products.c.products_count), 0),
+            func.coalesce(func.sum(products.c.total), 0),
+        )
+        .outerjoin(products, products.c.receipt_id == SalesReceipt.id)
+        .where(SalesReceipt.user_id.is_not(None))
+        .group_by(SalesReceipt.user_id, receipt_day)
+    )
+    payments = (
+        select(
+            func.gen_random_uuid(),
+            SalesReceipt.user_id,
+            receipt_day,
+            Payment.payment_type,
+            func.count(),
+            func.sum(Payment.amount),
+        )
+        .join(SalesReceipt, SalesReceipt.id == Payment.receipt_id)
+        .where(SalesReceipt.user_id.is_not(None))
+        .group_by(SalesReceipt.user_id, receipt_day, Payment.payment_type)
+    )
+    if since is not None:
+        sales = sales.where(SalesReceipt.created_at >= since)
+        payments = payments.where(SalesReceipt.created_at >= since)
+
+    sales_ids = await db_session.scalars(
+        insert(SalesDailyRollup)
+        .from_select(["id", "user_id", "day", "receipts_count", "products_count", "total"], sales)
+        .returning(SalesDailyRollup.id)
+    )
+    sales_rows = len(sales_ids.all())
+    payment_ids = await db_session.scalars(
+        insert(PaymentDailyRollup)
+        .from_select(["id", "user_id", "day", "payment_type", "payments_count", "amount"], payments)
+        .returning(PaymentDailyRollup.id)
+    )
+    payment_rows = len(payment_ids.all())
+    await db_session.commit()
+
+    return sales_rows, payment_rows
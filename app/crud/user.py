@@ -1,21 +1,60 @@
 import logging
-from typing import List
+from functools import partial
+from types import MappingProxyType
+from typing import List, Mapping
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, false
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, make_transient_to_detached
 from datetime import timedelta
 
+from app.config import settings
+from app.database import after_commit, integrity_constraint
 from app.models import User as DBModelUser
 from app.schemas.auth import Signup
 from app.schemas.user import UpdateProfile, ResetPasswordArgs
-from app.utils.auth import hash_password, utc_now, is_protected_username, verify_password
+from app.utils.auth import utc_now, is_protected_username
 from app.services.auth import new_token
+from app.services.password import hash_password_async, verify_password_async
+from app.utils.cache import TTLCache
 
 
-logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Column snapshots of authenticated users keyed by the lower-cased JWT subject (email)
+user_cache = TTLCache(max_size=settings.user_cache.max_size, ttl=settings.user_cache.ttl)
+
+
+def _user_snapshot(user: DBModelUser) -> Mapping:
+    return MappingProxyType(
+        {attr.key: getattr(user, attr.key) for attr in DBModelUser.__mapper__.column_attrs}
+    )
+
+
+# Errors reported when one of the case-insensitive unique indexes rejects a write
+DUPLICATE_USER_ERRORS = {
+    "ix_service_users_lower_username": "Username already exists",
+    "ix_service_users_lower_email": "Email already exists",
+}
+
+
+def invalidate_cached_user(email: str | None):
+    if email:
+        user_cache.pop(email.lower())
+
+
+async def _flush_user(db_session: AsyncSession):
+    try:
+        await db_session.flush()
+    except IntegrityError as e:
+        detail = DUPLICATE_USER_ERRORS.get(integrity_constraint(e))
+        if detail is None:
+            raise
+        logger.debug("Unique index violated: %s", detail)
+        raise HTTPException(status_code=400, detail=detail)
 
 
 async def get_all_users(db_session: AsyncSession) -> List[DBModelUser]:
@@ -46,6 +85,62 @@ async def get_user_by_email(db_session: AsyncSession, email: str) -> DBModelUser
 
 
 
+async def check_user_unique(db_session: AsyncSession, username: str | None = None, email: str | None = None):
+    """
+    Check with one query that no user has the username or the email, ignoring case.
+
+    A concurrent write can still take them before the caller's insert or
+    update, which the unique indexes reject with the same errors.
+
+    :param db_session: Asynchronous database session.
+    :param username: Username to check, if any.
+    :param email: Email to check, if any.
+
+    :raises HTTPException: 400 if the username or the email already exists.
+    """
+    if not username and not email:
+        return
+
+    username_taken = func.lower(DBModelUser.username) == username.lower() if username else false()
+    email_taken = func.lower(DBModelUser.email) == email.lower() if email else false()
+    result = await db_session.execute(
+        select(func.bool_or(username_taken), func.bool_or(email_taken)).where(or_(username_taken, email_taken))
+    )
+    username_exists, email_exists = result.one()
+
+    if username_exists:
+        logger.debug("Username already exists: %s", username)
+        raise HTTPException(status_code=400, detail="Username already exists")
+
+    if email_exists:
+        logger.debug("Email already exists: %s", email)
+        raise HTTPException(status_code=400, detail="Email already exists")
+
+
+async def get_cached_user_by_email(db_session: AsyncSession, email: str) -> DBModelUser | None:
+    """
+    Get a user by email, serving repeated lookups from the user cache.
+
+    On a cache hit the snapshot is attached to the session as a persistent
+    instance without a SELECT, so callers can still modify and commit it.
+
+    :param db_session: Asynchronous database session.
+    :param email: The user's email, usually the access token subject.
+
+    :return: Found user or None.
+    """
+    snapshot = user_cache.get(email.lower())
+    if snapshot is None:
+        user = await get_user_by_email(db_session, email)
+        if user is not None:
+            user_cache.set(email.lower(), _user_snapshot(user))
+        return user
+
+    user = DBModelUser(**snapshot)
+    make_transient_to_detached(user)
+    return await db_session.merge(user, load=False)
+
+
 async def get_admin_user_by_email(db_session: AsyncSession, email: str) -> DBModelUser | None:
     return await db_session.scalar(
         select(DBModelUser).filter(
@@ -56,7 +151,7 @@ async def get_admin_user_by_email(db_session: AsyncSession, email: str) -> DBMod
 
 
 async def create_user(db_session: AsyncSession, signup: Signup) -> DBModelUser:
-    password_hash = hash_password(signup.password)
+    password_hash = await hash_password_async(signup.password)
     now = utc_now()
 
     user = DBModelUser(
@@ -67,31 +162,27 @@ async def create_user(db_session: AsyncSession, signup: Signup) -> DBModelUser:
     )
 
     db_session.add(user)
-    await db_session.commit()
+    await _flush_user(db_session)
 
     return user
 
 
 async def update_user_profile(db_session: AsyncSession, current_user: DBModelUser, profile_update: UpdateProfile):
-    if profile_update.username:
-        if is_protected_username(profile_update.username):
-            logging.debug(f"Invalid username detected: {profile_update.username}")
-            raise HTTPException(status_code=400, detail="Invalid username")
+    old_email = current_user.email
 
-        if await get_user_by_username(db_session, profile_update.username):
-            logging.debug(f"Username already exists: {profile_update.username}")
-            raise HTTPException(status_code=400, detail="Username already exists")
+    if profile_update.username and is_protected_username(profile_update.username):
+        logger.debug("Invalid username detected: %s", profile_update.username)
+        raise HTTPException(status_code=400, detail="Invalid username")
 
-        current_user.username = profile_update.username
+    await check_user_unique(db_session, profile_update.username, profile_update.email)
 
+    if profile_update.username:
+        current_user.username = profile_update.username
     if profile_update.email:
-        if await get_user_by_email(db_session, profile_update.email):
-            logging.debug(f"Email already    exists: {profile_update.email}")
-            raise HTTPException(status_code=400, detail="Email already exists")
-
         current_user.email = profile_update.email
 
-    await db_session.commit()
+    await _flush_user(db_session)
+    after_commit(db_session, partial(invalidate_cached_user, old_email))
 
     return current_user
 
@@ -101,20 +192,22 @@ async def create_password_token(db_session: AsyncSession, user: DBModelUser):
     user.password_reset_token = new_token()
 
     db_session.add(user)
-    await db_session.commit()
+    await db_session.flush()
+    after_commit(db_session, partial(invalidate_cached_user, user.email))
 
     return user
 
 
 async def create_new_password(db_session: AsyncSession, user: DBModelUser, reset_password_args: ResetPasswordArgs):
     # Проверка, что текущий пароль верный
-    if not verify_password(reset_password_args.old_password, user.hashed_password):
+    if not await verify_password_async(reset_password_args.old_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect old password")
 
     # Установка нового хэша пароля
-    user.hashed_password = hash_password(reset_password_args.password)
+    user.hashed_password = await hash_password_async(reset_password_args.password)
     user.password_reset_expire = None
     user.password_reset_token = None
 
     db_session.add(user)
-    await db_session.commit()
+    await db_session.flush()
+    after_commit(db_session, partial(invalidate_cached_user, user.email))
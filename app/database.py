@@ -1,6 +1,13 @@
-from typing import AsyncIterator
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+import asyncio
 import contextlib
+import logging
+import math
+import time
 
+from sqlalchemy import exc, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -8,30 +15,353 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
     AsyncEngine,
 )
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings, DatabasePool, DatabaseReplicas
+from app.utils.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the replica has replayed
+# everything it received (an idle primary would otherwise look like lag).
+# A server that is not in recovery is not lagging at all.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts take and how often they time out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        self.checkouts += 1
+        return connection
+
+
+class QueryStats:
+    """
+    Number of SQL statements and commits run on behalf of one request, and their database time.
+    """
+
+    __slots__ = ("queries", "commits", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.commits = 0
+        self.seconds = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect the statements executed in the current context, including tasks started from it.
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def _commit(conn):
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def after_commit(db_session: AsyncSession, callback: Callable[[], Any]):
+    """
+    Run a callback once the session's current transaction commits, or right away outside of a transaction.
+
+    Callbacks of a transaction that is rolled back or closed without a commit
+    are dropped. Use it for side effects that must not be seen before the
+    data is, such as cache invalidation.
+
+    :param db_session: Asynchronous database session.
+    :param callback: Called without arguments.
+    """
+    if not db_session.in_transaction():
+        callback()
+        return
+    db_session.info.setdefault("after_commit", []).append(callback)
+
+
+def after_rollback(db_session: AsyncSession, callback: Callable[[AsyncSession], Awaitable[Any]]):
+    """
+    Run an async callback if the session is rolled back because of an error, including a failed commit.
+
+    Only sessions of :meth:`DatabaseSessionManager.session` run these
+    callbacks, after the rollback and before the error propagates. Callbacks
+    are dropped once the session commits. Use it to undo work committed
+    earlier in the request, such as a claim on an idempotency key.
+
+    :param db_session: Asynchronous database session.
+    :param callback: Called with the rolled back session; commits its own changes.
+    """
+    db_session.info.setdefault("after_rollback", []).append(callback)
+
+
+async def _run_after_rollback(session: AsyncSession):
+    for callback in session.info.pop("after_rollback", []):
+        try:
+            await callback(session)
+        except Exception:
+            logger.exception("After rollback callback %r failed", callback)
+            await session.rollback()
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    session.info.pop("after_rollback", None)
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("After commit callback %r failed", callback)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+
+def integrity_constraint(error: exc.IntegrityError) -> str | None:
+    """
+    Name of the constraint or unique index an IntegrityError was raised for, with psycopg or asyncpg.
+    """
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    return getattr(error.orig.__cause__, "constraint_name", None)
+
+
+def _create_engine(host: str, echo: bool, pool: DatabasePool) -> AsyncEngine:
+    connect_args = {}
+    if make_url(host).get_driver_name() == "asyncpg":
+        connect_args = {
+            "prepared_statement_cache_size": pool.statement_cache_size,
+            "statement_cache_size": pool.statement_cache_size,
+        }
+
+    engine = create_async_engine(
+        host,
+        echo=echo,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=pool.pool_size,
+        max_overflow=pool.max_overflow,
+        pool_timeout=pool.pool_timeout,
+        pool_recycle=pool.pool_recycle,
+        pool_pre_ping=pool.pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+    event.listen(sync_engine, "commit", _commit)
+
+    return engine
+
+
+def _pool_stats(pool: InstrumentedAsyncPool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool.checkouts,
+        "checkout_timeouts": pool.checkout_timeouts,
+        "wait_seconds": pool.wait_seconds,
+        "max_wait_seconds": pool.max_wait_seconds,
+    }
+
+
+class Replica:
+    """
+    Engine of one read replica and its last measured replication lag.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(autocommit=False, expire_on_commit=False, bind=engine)
+        url = engine.url
+        self.name = f"{url.host}:{url.port or 5432}/{url.database}"
+
+        self.lag = math.inf
+        self.checked_at: float | None = None
+        self.retry_at = 0.0
+        self.reads = 0
+        self.check_failures = 0
+
+    async def _query_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            return float(await connection.scalar(REPLICA_LAG_QUERY))
+
+    async def check_lag(self, timeout: float, failure_backoff: float) -> float:
+        """
+        Measure the replication lag, counting a replica that can't be reached within ``timeout`` as lagging.
+
+        :param timeout: Seconds the check may take, connecting included.
+        :param failure_backoff: Seconds a failed replica is left alone before it is checked again.
+        """
+        try:
+            self.lag = await asyncio.wait_for(self._query_lag(), timeout)
+        except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError):
+            self.lag = math.inf
+            self.check_failures += 1
+            self.retry_at = time.monotonic() + failure_backoff
+            logger.warning("Replica %s lag check failed", self.name, exc_info=True, extra={"replica": self.name})
+        self.checked_at = time.monotonic()
+        return self.lag
 
 
 class DatabaseSessionManager:
     def __init__(self):
         self._sessionmaker: async_sessionmaker | None = None
         self._engine: AsyncEngine | None = None
+        self._replicas: list[Replica] = []
+        self._replica_config: DatabaseReplicas | None = None
+        self._next_replica = 0
+        self._replica_monitor: PeriodicTask | None = None
 
-    def init(self, host: str, echo: bool = False):
-        self._engine = create_async_engine(host, echo=echo)
+        self.replica_fallbacks = 0
 
+    def init(
+            self,
+            host: str,
+            echo: bool = False,
+            pool: DatabasePool | None = None,
+            replicas: DatabaseReplicas | None = None
+    ):
+        pool = pool or settings.database_pool
+        self._replica_config = replicas or settings.database_replicas
+
+        self._engine = _create_engine(host, echo, pool)
         self._sessionmaker = async_sessionmaker(
             autocommit=False,
             expire_on_commit=False,
             bind=self._engine,
         )
+        self._replicas = [Replica(_create_engine(url, echo, pool)) for url in self._replica_config.urls]
+        self._next_replica = 0
+        self._replica_monitor = None
+        if self._replicas:
+            self._replica_monitor = PeriodicTask(
+                self.check_replicas, self._replica_config.lag_check_interval, "Replica lag check"
+            )
+
+    def start_replica_monitor(self):
+        """
+        Start measuring the lag of the replicas in the background; until then reads go to the primary.
+        """
+        if self._replica_monitor is not None:
+            self._replica_monitor.start()
 
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
 
+        if self._replica_monitor is not None:
+            await self._replica_monitor.close()
+            self._replica_monitor = None
         await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.engine.dispose()
 
         self._sessionmaker = None
         self._engine = None
+        self._replicas = []
+
+    def pool_stats(self) -> dict:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        return _pool_stats(self._engine.pool)
+
+    def replica_stats(self) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "lag": replica.lag if replica.checked_at is not None else None,
+                "reads": replica.reads,
+                "check_failures": replica.check_failures,
+                **_pool_stats(replica.engine.pool),
+            }
+            for replica in self._replicas
+        ]
+
+    async def check_replicas(self):
+        """
+        Measure the lag of all replicas at once, skipping those that failed within the last ``failure_backoff``.
+        """
+        config = self._replica_config
+        now = time.monotonic()
+        await asyncio.gather(*(
+            replica.check_lag(config.lag_check_timeout, config.failure_backoff)
+            for replica in self._replicas
+            if replica.retry_at <= now
+        ))
+
+    def _pick_replica(self) -> Replica | None:
+        """
+        Next replica in round-robin order whose last measured lag is within ``max_lag``, if any.
+
+        Only reads the lag measured by :meth:`check_replicas`, so picking a
+        replica never waits on the network.
+        """
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[self._next_replica % len(self._replicas)]
+            self._next_replica += 1
+            if replica.lag <= self._replica_config.max_lag:
+                return replica
+        return None
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -52,6 +382,37 @@ class DatabaseSessionManager:
 
         session = self._sessionmaker()
 
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            await _run_after_rollback(session)
+            raise
+        finally:
+            await session.close()
+
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Session for read-only work, bound to a replica when one is close enough to the primary.
+
+        Falls back to the primary when no replicas are configured or all of
+        them lag more than ``max_lag`` seconds or can't be reached. Reads may
+        miss the latest writes by up to ``max_lag`` seconds, so routes reading
+        their own writes must keep using :meth:`session`.
+        """
+        if self._sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        replica = self._pick_replica() if self._replicas else None
+        if replica is None:
+            if self._replicas:
+                self.replica_fallbacks += 1
+            session = self._sessionmaker()
+        else:
+            replica.reads += 1
+            session = replica.sessionmaker()
+
         try:
             yield session
         except Exception:
@@ -65,5 +426,16 @@ sessionmanager = DatabaseSessionManager()
 
 
 async def get_db_session():
+    """
+    Request-scoped session, committed once after the route returns and rolled back if it raises.
+
+    CRUD functions only flush, so all writes of a request share one transaction.
+    """
     async with sessionmanager.session() as session:
         yield session
+        await session.commit()
+
+
+async def get_db_read_session():
+    async with sessionmanager.read_session() as session:
+        yield session
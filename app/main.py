@@ -1,57 +1,56 @@
-import logging
-import sys
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
-from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import JSONResponse
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from app.api.routers.users import router as user_router
 from app.api.routers.auth import router as auth_router
+from app.api.routers.products import router as product_router
+from app.api.middleware import RequestLoggingMiddleware, BearerSessionMiddleware
 from app.config import settings, config
 from app.database import sessionmanager
-
-logging.basicConfig(stream=sys.stdout, level=logging.DEBUG if settings.log_level == "DEBUG" else logging.INFO)
-
-root_logger = logging.getLogger("root_logger")
+from app.services.log import log_sink
+from app.services.log_partitions import log_partition_maintainer
+from app.services.password import password_hasher
+from app.services.token_sweeper import token_sweeper
+from app.utils.logging import setup_logging, shutdown_logging
+from app.utils.metrics import registry
 
 
 def get_application(settings_db: str = "", init_db: bool = True) -> FastAPI:
     if init_db:
         sessionmanager.init(settings_db)
 
-        @asynccontextmanager
-        async def lifespan(app: FastAPI):
-            yield
-            if sessionmanager._engine is not None:
-                await sessionmanager.close()
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        setup_logging(settings.log_level)
+        sessionmanager.start_replica_monitor()
+        log_sink.start()
+        token_sweeper.start()
+        log_partition_maintainer.start()
+        yield
+        await log_partition_maintainer.close()
+        await token_sweeper.close()
+        await log_sink.close()
+        password_hasher.shutdown()
+        if init_db and sessionmanager._engine is not None:
+            await sessionmanager.close()
+        shutdown_logging()
 
     app = FastAPI(lifespan=lifespan, title=settings.project_name, docs_url="/api/docs")
-    app.add_middleware(SessionMiddleware, secret_key="some-random-string")
-
-    @app.middleware("http")
-    async def exception_handling(request: Request, call_next):
-        root_logger.info(
-            f"Url: {request.url}\n"
-            f"Header: {request.headers}\n"
-            f"Method: {request.method}\n"
-            f"Query params: {request.query_params}\n"
-            f"Path params: {request.path_params}\n"
-        )
-        try:
-            return await call_next(request)
-        except Exception as exc:
-            root_logger.error(str(exc), exc_info=True)
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": str(exc)},
-            )
+    app.add_middleware(BearerSessionMiddleware, secret_key="some-random-string")
+    app.add_middleware(RequestLoggingMiddleware, config=settings.request_logging)
 
     @app.get("/")
     async def root():
         return {"message": "Hello World"}
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     app.include_router(user_router)
     app.include_router(auth_router)
+    app.include_router(product_router)
 
     return app
 
@@ -67,12 +66,13 @@ def init_app(init_db=True):
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
+            sessionmanager.start_replica_monitor()
             yield
             if sessionmanager._engine is not None:
                 await sessionmanager.close()
 
     server = FastAPI(title="FastAPI server", lifespan=lifespan)
-    server.add_middleware(SessionMiddleware, secret_key="some-random-string")
+    server.add_middleware(BearerSessionMiddleware, secret_key="some-random-string")
 
     @server.get("/")
     async def root():
@@ -80,5 +80,6 @@ def init_app(init_db=True):
 
     server.include_router(user_router)
     server.include_router(auth_router)
+    server.include_router(product_router)
 
     return app
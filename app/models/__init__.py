@@ -3,4 +3,7 @@ from .auth import AuthToken
 from .log import Log
 from .sales_receipt_products import SalesReceiptProducts
 from .payment import Payment
-from .sales_receipt import SalesReceipt
\ No newline at end of file
+from .product import Products
+from .sales_receipt import SalesReceipt
+from .sales_rollup import SalesDailyRollup, PaymentDailyRollup
+from .idempotency import IdempotencyKey
@@ -7,8 +7,9 @@ from .base import Base
 class AuthToken(Base):
     __tablename__ = "service_auth_tokens"
 
-    secret: Mapped[str] = mapped_column(String(1024), unique=True, index=True)
-    expiration: Mapped[datetime]
+    # SHA-256 hex digest of the refresh token
+    secret_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    expiration: Mapped[datetime] = mapped_column(index=True)
     created: Mapped[datetime]
 
     token_type: Mapped[str] = mapped_column(Enum("refresh", name="token_types"))
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import String, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key and the response it produced.
+
+    While the first request is running ``response`` is NULL and ``expires_at``
+    is a short lock deadline; once it has completed ``expires_at`` is the end
+    of the replay window. Expired rows may be claimed again.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    key: Mapped[str] = mapped_column(String(255))
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    response = mapped_column(JSONB(none_as_null=True), nullable=True)
+    created_at: Mapped[datetime]
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
+    user_id = mapped_column(ForeignKey("service_users.id", ondelete="CASCADE"), nullable=False)
@@ -1,17 +1,27 @@
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import mapped_column, relationship, Mapped
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, String, DDL, event
 from datetime import datetime
 from .base import Base
 from uuid import UUID
 
 class Log(Base):
     __tablename__ = "service_logs"
+    # Monthly partitions are managed by app.services.log_partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (created)"}
 
     log_type: Mapped[str] = mapped_column(String(64), index=True)
     target_id: Mapped[UUID] = mapped_column(nullable=True)
-    created: Mapped[datetime] = mapped_column(index=True)
+    created: Mapped[datetime] = mapped_column(primary_key=True, index=True)
     data: Mapped[dict] = mapped_column(JSONB, default={})
 
     user_id = mapped_column(ForeignKey("service_users.id"))
     user: Mapped["User"] = relationship(foreign_keys=[user_id])
+
+
+# Catches rows outside the monthly partitions, so inserts never fail
+event.listen(
+    Log.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS service_logs_default PARTITION OF service_logs DEFAULT"),
+)
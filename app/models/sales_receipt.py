@@ -2,7 +2,7 @@ import decimal
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Numeric, ForeignKey
+from sqlalchemy import Numeric, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -10,6 +10,10 @@ from .base import Base
 
 class SalesReceipt(Base):
     __tablename__ = "sales_receipts"
+    __table_args__ = (
+        # Keyset pagination of a cashier's receipts
+        Index("ix_sales_receipts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     total: Mapped[Decimal] = mapped_column(Numeric(10, 2))
     rest: Mapped[Decimal] = mapped_column(Numeric(10, 2))
@@ -19,4 +23,4 @@ class SalesReceipt(Base):
     user: Mapped["User"] = relationship("User", back_populates="sales_receipts")
 
     sales_receipt_products: Mapped[list["SalesReceiptProducts"]] = relationship("SalesReceiptProducts", back_populates="receipt")
-    payments: Mapped["Payment"] = relationship("Payment", back_populates="receipt")
\ No newline at end of file
+    payments: Mapped[list["Payment"]] = relationship("Payment", back_populates="receipt")
\ No newline at end of file
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import String, Numeric, ForeignKey
+from sqlalchemy import String, Numeric, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -8,6 +8,10 @@ from .base import Base
 
 class SalesReceiptProducts(Base):
     __tablename__ = "sales_receipt_products"
+    __table_args__ = (
+        # Keyset pagination of a receipt's products
+        Index("ix_sales_receipt_products_receipt_id_id", "receipt_id", "id"),
+    )
 
     title: Mapped[str] = mapped_column(String(255))
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2))
@@ -0,0 +1,42 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import ForeignKey, Enum, Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+from .enums.payment import PaymentType
+
+
+class SalesDailyRollup(Base):
+    """Receipts, products and sales total per cashier per receipt day."""
+
+    __tablename__ = "sales_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_sales_daily_rollups_user_id_day"),
+    )
+
+    day: Mapped[date]
+    receipts_count: Mapped[int] = mapped_column(default=0)
+    products_count: Mapped[int] = mapped_column(default=0)
+    total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+    user_id = mapped_column(ForeignKey("service_users.id", ondelete="CASCADE"), nullable=False)
+
+
+class PaymentDailyRollup(Base):
+    """Payments count and amount per cashier per receipt day and payment type."""
+
+    __tablename__ = "payment_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "day", "payment_type", name="uq_payment_daily_rollups_user_id_day_payment_type"
+        ),
+    )
+
+    day: Mapped[date]
+    payment_type: Mapped[PaymentType] = mapped_column(Enum(PaymentType), nullable=False)
+    payments_count: Mapped[int] = mapped_column(default=0)
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+    user_id = mapped_column(ForeignKey("service_users.id", ondelete="CASCADE"), nullable=False)
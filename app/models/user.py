@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Enum, Numeric
+from sqlalchemy import String, Enum, Numeric, Index, func
 from datetime import datetime
 
 from .base import Base
@@ -8,8 +8,9 @@ from .base import Base
 class User(Base):
     __tablename__ = "service_users"
 
-    username: Mapped[str] = mapped_column(String(64), index=True, unique=True)
-    email: Mapped[str] = mapped_column(String(255), index=True, unique=True)
+    # Uniqueness and lookups are case-insensitive, see the lower() indexes below
+    username: Mapped[str] = mapped_column(String(64))
+    email: Mapped[str] = mapped_column(String(255))
     hashed_password: Mapped[str] = mapped_column(nullable=True)
     created: Mapped[datetime]
 
@@ -23,4 +24,8 @@ class User(Base):
 
 
     refresh_tokens: Mapped[list["AuthToken"]] = relationship("AuthToken", back_populates="user", cascade="all, delete-orphan")
-    sales_receipts: Mapped[list["SalesReceipt"]] = relationship("SalesReceipt", back_populates="user")
\ No newline at end of file
+    sales_receipts: Mapped[list["SalesReceipt"]] = relationship("SalesReceipt", back_populates="user")
+
+
+Index("ix_service_users_lower_username", func.lower(User.username), unique=True)
+Index("ix_service_users_lower_email", func.lower(User.email), unique=True)
@@ -0,0 +1,26 @@
+from datetime import date
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+from app.models.enums.payment import PaymentType
+
+
+class PaymentTypeSales(BaseModel):
+    payment_type: PaymentType
+    payments_count: int
+    amount: Decimal
+
+
+class DailySales(BaseModel):
+    day: date
+    receipts_count: int = 0
+    products_count: int = 0
+    total: Decimal = Decimal(0)
+    payments: list[PaymentTypeSales] = Field(default_factory=list)
+
+
+class SalesAnalytics(BaseModel):
+    start: date
+    end: date
+    days: list[DailySales]
@@ -0,0 +1,25 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.enums.payment import PaymentType
+
+
+class CreatePayment(BaseModel):
+    payment_type: PaymentType = Field(examples=[PaymentType.cash])
+    amount: Decimal = Field(gt=0, decimal_places=2)
+
+
+class AddPayment(CreatePayment):
+    receipt_id: UUID
+
+
+class PaymentDetails(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    payment_type: PaymentType
+    amount: Decimal
+    created_at: datetime
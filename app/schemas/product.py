@@ -0,0 +1,28 @@
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from . import Title, Price
+
+
+class CreateProduct(Title, Price):
+    pass
+
+
+class UpdateProduct(BaseModel):
+    title: str | None = Field(default=None, min_length=1, max_length=255)
+    price: Decimal | None = Field(default=None, gt=0, decimal_places=2)
+
+
+class ProductDetails(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    title: str
+    price: Decimal
+
+
+class ProductPage(BaseModel):
+    items: list[ProductDetails]
+    next_cursor: str | None = None
@@ -1,8 +1,13 @@
+from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 from . import Total
+from .payment import CreatePayment, PaymentDetails
+from .sales_receipt_products import CreateSalesReceiptProduct, SalesReceiptProductDetails
 
 
 class Rest(BaseModel):
@@ -12,3 +17,32 @@ class Rest(BaseModel):
 class CreateSalesReceipt(Total, Rest):
     pass
 
+
+class CreateSalesReceiptWithProducts(BaseModel):
+    products: list[CreateSalesReceiptProduct] = Field(min_length=1, max_length=500)
+    payments: list[CreatePayment] = Field(default_factory=list, max_length=20)
+
+
+class SalesReceiptDetails(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    total: Decimal
+    rest: Decimal
+    created_at: datetime
+    sales_receipt_products: list[SalesReceiptProductDetails]
+    payments: list[PaymentDetails]
+
+
+class SalesReceiptSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    total: Decimal
+    rest: Decimal
+    created_at: datetime
+
+
+class SalesReceiptPage(BaseModel):
+    items: list[SalesReceiptSummary]
+    next_cursor: str | None = None
@@ -1,6 +1,7 @@
 from decimal import Decimal
+from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from . import Title, Price, Total
 
@@ -8,8 +9,29 @@ from . import Title, Price, Total
 class Quantity(BaseModel):
     quantity: Decimal = Field(gt=0)
 
-class CreateSalesReceiptProduct(Title, Price, Quantity):
-    pass
+class CreateSalesReceiptProduct(Quantity):
+    """
+    A receipt line, either for a catalog product or with a free-form title and price.
+
+    Lines for a catalog product take the product's current title and price.
+    """
+    product_id: UUID | None = None
+    title: str | None = Field(default=None, min_length=1, max_length=255, examples=["FPW Dron 6s"])
+    price: Decimal | None = Field(default=None, gt=0, decimal_places=2)
+
+    @model_validator(mode="after")
+    def check_product_or_title_and_price(self):
+        if self.product_id is not None:
+            if self.title is not None or self.price is not None:
+                raise ValueError("Title and price are taken from the product")
+        elif self.title is None or self.price is None:
+            raise ValueError("Either product_id or title and price are required")
+
+        return self
+
+
+class AddSalesReceiptProduct(CreateSalesReceiptProduct):
+    receipt_id: UUID
 
 class SalesReceiptProduct(Title, Price, Quantity):
     total: Decimal = Field(gt=0, decimal_places=2)
@@ -24,3 +46,18 @@ class SalesReceiptProduct(Title, Price, Quantity):
 
         return value
 
+
+class SalesReceiptProductDetails(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    product_id: UUID | None = None
+    title: str
+    price: Decimal
+    quantity: Decimal
+    total: Decimal
+
+
+class SalesReceiptProductPage(BaseModel):
+    items: list[SalesReceiptProductDetails]
+    next_cursor: str | None = None
@@ -1,8 +1,12 @@
+import hashlib
 import os
+import time
 import uuid
 
 import jwt
 import secrets
+from types import MappingProxyType
+from typing import Mapping
 from fastapi import Depends, HTTPException, Request
 from datetime import datetime, timezone, timedelta
 from starlette import status
@@ -14,11 +18,18 @@ from app.models import AuthToken
 from app.schemas.user import User
 from app.constants import TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
 from app.models.user import User as DB_User
-from app.utils.auth import utc_now
+from app.utils.auth import utc_now, parse_bearer_token
+from app.utils.cache import TTLCache
+from app.services.keyring import keyring
+from app.services.metrics import jwt_duration
 
 ACCESS_TOKEN_SECRET_KEY = settings.auth_jwt.access_token_secret_key
 ACCESS_TOKEN_ALGORITHM = settings.auth_jwt.access_token_algorithm
 
+# Verified payloads keyed by the SHA-256 digest of the token, each kept until the token's exp
+jwt_payload_cache = TTLCache(max_size=settings.auth_jwt.payload_cache_size, ttl=0)
+keyring.on_keys_changed.append(jwt_payload_cache.clear)
+
 
 def new_token():
     """
@@ -29,8 +40,19 @@ def new_token():
     return secrets.token_urlsafe(32)
 
 
+def get_request_access_token(request: Request) -> str | None:
+    """
+    Get the access token from the Authorization header or, failing that, the session cookie.
+    """
+    token = parse_bearer_token(request.headers.get("authorization"))
+    if token is not None:
+        return token
+
+    return request.session.get('access_token')
+
+
 def get_access_token(request: Request):
-    token = request.session.get('access_token')
+    token = get_request_access_token(request)
 
     if not bool(token):
         raise HTTPException(status_code=401, detail="Invalid access token")
@@ -39,7 +61,7 @@ def get_access_token(request: Request):
 
 
 def get_email_from_token_payload(token: str | bytes) -> str:
-    payload = decode_jwt(token)
+    payload = decode_jwt_cached(token)
     if payload.get("type") != ACCESS_TOKEN_TYPE:
         raise credentials_exception
 
@@ -52,22 +74,54 @@ def get_email_from_token_payload(token: str | bytes) -> str:
 
 def decode_jwt(
         token: str | bytes,
-        public_key: str = settings.auth_jwt.public_key_path.read_text(),
+        public_key: object | None = None,
         algorithm: str = ACCESS_TOKEN_ALGORITHM,
         verify_exp: bool = True
 ) -> dict:
+    start = time.perf_counter()
+    if public_key is None:
+        public_key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+
     decoded = jwt.decode(
         token,
         public_key,
         algorithms=[algorithm],
         options={"verify_exp": verify_exp}
     )
+    jwt_duration.observe(time.perf_counter() - start, "verify")
     return decoded
 
 
+def decode_jwt_cached(token: str | bytes, verify_exp: bool = True) -> Mapping:
+    """
+    Decode the token, reusing the payload of an earlier successful verification.
+
+    A cached payload is only returned while the token is unexpired, so
+    ``verify_exp`` matters only on a cache miss. Expired tokens decoded with
+    ``verify_exp=False`` are never cached.
+
+    :param token: The encoded token.
+    :param verify_exp: Whether to reject an expired token.
+
+    :returns: Read-only token payload.
+    :raises jwt.InvalidTokenError: If the token cannot be verified.
+    """
+    key = hashlib.sha256(token.encode() if isinstance(token, str) else token).digest()
+
+    payload = jwt_payload_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = MappingProxyType(decode_jwt(token, verify_exp=verify_exp))
+    if "exp" in payload:
+        jwt_payload_cache.set(key, payload, ttl=payload["exp"] - time.time())
+
+    return payload
+
+
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.auth_jwt.private_key_path.read_text(),
+        private_key: object | None = None,
         algorithm: str = ACCESS_TOKEN_ALGORITHM,
         expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
         expire_timedelta: timedelta | None = None
@@ -85,20 +139,28 @@ def encode_jwt(
         iat=now,
         jti=str(uuid.uuid4()),
     )
+    start = time.perf_counter()
+    headers = None
+    if private_key is None:
+        kid, private_key = keyring.signing_key()
+        headers = {"kid": kid}
+
     encoded = jwt.encode(
         to_encode,
         private_key,
-        algorithm=algorithm
+        algorithm=algorithm,
+        headers=headers,
     )
+    jwt_duration.observe(time.perf_counter() - start, "sign")
     return encoded
 
 
 def get_token_payload(
         token: str,
         check_expired_token: bool = True
-) -> dict:
+) -> Mapping:
     try:
-        payload = decode_jwt(token=token, verify_exp=check_expired_token)
+        payload = decode_jwt_cached(token=token, verify_exp=check_expired_token)
     except jwt.InvalidTokenError as e:
         raise HTTPException(
             status_code=401,
@@ -108,7 +170,7 @@ def get_token_payload(
 
 
 def validate_token_type(
-        payload: dict,
+        payload: Mapping,
         token_type: str,
 ) -> bool:
     current_token_type = payload.get(TOKEN_TYPE_FIELD)
@@ -123,7 +185,7 @@ def validate_token_type(
 def check_auth_user_from_token_by_payload(
     token_type: str,
     user_email: str,
-    payload: dict,
+    payload: Mapping,
 ) -> bool:
     try:
         validate_token_type(payload, token_type)
@@ -161,6 +223,13 @@ def create_access_token(user: User, refresh_token: AuthToken) -> str:
     )
 
 
+def hash_refresh_token(token: str) -> str:
+    """
+    Digest stored in place of the refresh token itself, 64 hex characters.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def create_refresh_token(user: User) -> str:
     jwt_payload = {
         "sub": user.email,
@@ -0,0 +1,47 @@
+import csv
+import io
+from typing import AsyncIterator
+
+from app.models import SalesReceipt
+from app.schemas.sales_receipt import SalesReceiptDetails
+
+CSV_COLUMNS = [
+    "record_type", "receipt_id", "created_at", "receipt_total", "receipt_rest",
+    "title", "price", "quantity", "total", "payment_type", "amount",
+]
+
+
+async def receipts_to_ndjson(receipts: AsyncIterator[SalesReceipt]) -> AsyncIterator[str]:
+    """
+    Render receipts as newline-delimited JSON, one receipt with its products and payments per line.
+    """
+    async for receipt in receipts:
+        yield SalesReceiptDetails.model_validate(receipt).model_dump_json() + "\n"
+
+
+async def receipts_to_csv(receipts: AsyncIterator[SalesReceipt]) -> AsyncIterator[str]:
+    """
+    Render receipts as CSV with one row per receipt, product and payment.
+
+    Product and payment rows repeat the receipt columns and are told apart by ``record_type``.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    async for receipt in receipts:
+        head = [receipt.id, receipt.created_at.isoformat(), receipt.total, receipt.rest]
+        writer.writerow(["receipt", *head, "", "", "", "", "", ""])
+        for product in receipt.sales_receipt_products:
+            writer.writerow(["product", *head, product.title, product.price, product.quantity, product.total, "", ""])
+        for payment in receipt.payments:
+            writer.writerow(["payment", *head, "", "", "", "", payment.payment_type.value, payment.amount])
+        yield flush()
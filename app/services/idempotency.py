@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings, Idempotency
+from app.crud.idempotency import (claim_idempotency_key, get_idempotency_key, complete_idempotency_key,
+                                  release_idempotency_key)
+from app.database import after_commit, after_rollback
+from app.utils.cache import TTLCache
+
+
+def request_fingerprint(endpoint: str, payload: Any = None) -> str:
+    """
+    Hash an endpoint and its request payload so a key can't be reused for a different request.
+    """
+    raw = json.dumps([endpoint, jsonable_encoder(payload)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Run a write at most once per ``(user, Idempotency-Key)`` and replay its response.
+
+    Keys are claimed in the ``idempotency_keys`` table so that retries hitting
+    another worker are deduplicated too. The claim is committed on the
+    request's own session, so a request never needs a second connection. The
+    response is stored in the transaction of the write, so a crash between the
+    two can't leave a committed write behind a key that a retry may claim
+    again. Completed responses are also kept in an in-process cache once
+    committed, and a duplicate that arrives while the first request is still
+    running in this process waits on it before looking at the table. A request
+    whose transaction is rolled back, including by a failed commit, releases
+    its key, so the next retry runs the write again.
+    """
+
+    def __init__(self, config: Idempotency):
+        self.config = config
+        self.cache = TTLCache(max_size=config.cache_max_size, ttl=min(config.cache_ttl, config.ttl))
+        self._in_flight: dict[tuple[UUID, str], asyncio.Future] = {}
+
+        self.executed = 0
+        self.replayed = 0
+
+    async def run(
+            self,
+            db_session: AsyncSession,
+            user_id: UUID,
+            key: str | None,
+            fingerprint: str,
+            handler: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Run the handler unless the key has already produced a response.
+
+        :param db_session: Session of the write, from :meth:`DatabaseSessionManager.session`.
+            The claim commits it, so nothing may be written before; the response
+            is stored in the transaction of the write, which the caller commits.
+        :param user_id: ID of the user who sent the key.
+        :param key: The Idempotency-Key header value; the handler always runs when None.
+        :param fingerprint: Result of :func:`request_fingerprint` for the request.
+        :param handler: Performs the write and returns the response body.
+
+        :return: JSON-compatible response body and whether it was replayed.
+
+        :raises HTTPException: 422 if the key was used for a different request,
+            409 if another request still holds the key after ``lock_timeout``
+            or took it over because the handler ran longer than that.
+        """
+        if key is None:
+            return jsonable_encoder(await handler()), False
+
+        cache_key = (user_id, key)
+        while True:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._replay(cached, fingerprint), True
+
+            in_flight = self._in_flight.get(cache_key)
+            if in_flight is None:
+                break
+            # Completes whether the first request succeeded or not; in the
+            # latter case its key is released and this request takes over.
+            await asyncio.wait([in_flight])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = future
+        try:
+            return await self._execute(db_session, user_id, key, fingerprint, handler)
+        finally:
+            del self._in_flight[cache_key]
+            future.set_result(None)
+
+    async def _execute(self, db_session, user_id, key, fingerprint, handler) -> tuple[Any, bool]:
+        deadline = time.monotonic() + self.config.lock_timeout
+        while True:
+            claim_id = await claim_idempotency_key(db_session, user_id, key, fingerprint, self.config.lock_timeout)
+            if claim_id is not None:
+                break
+            existing = await get_idempotency_key(db_session, user_id, key)
+            # Don't stay idle in a transaction while waiting
+            await db_session.commit()
+
+            if existing is not None and existing.response is not None:
+                cached = (existing.fingerprint, existing.response)
+                self.cache.set((user_id, key), cached)
+                return self._replay(cached, fingerprint), True
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still in progress"
+                )
+            await asyncio.sleep(self.config.poll_interval)
+
+        after_rollback(db_session, partial(release_idempotency_key, claim_id=claim_id))
+        body = jsonable_encoder(await handler())
+        if not await complete_idempotency_key(db_session, claim_id, body, self.config.ttl):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The Idempotency-Key was taken over by a retry while this request was running"
+            )
+
+        after_commit(db_session, partial(self.cache.set, (user_id, key), (fingerprint, body)))
+        self.executed += 1
+        return body, False
+
+    def _replay(self, cached: tuple[str, Any], fingerprint: str) -> Any:
+        stored_fingerprint, body = cached
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+
+        self.replayed += 1
+        return body
+
+    def stats(self) -> dict:
+        return {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "in_flight": len(self._in_flight),
+            "cache": self.cache.stats(),
+        }
+
+
+idempotency_store = IdempotencyStore(settings.idempotency)
@@ -0,0 +1,136 @@
+import logging
+import time
+from pathlib import Path
+from typing import Callable
+
+import jwt
+from cryptography.hazmat.primitives.serialization import (load_pem_private_key, load_pem_public_key, Encoding,
+                                                          PublicFormat)
+
+from app.config import settings, AuthJWT
+
+logger = logging.getLogger(__name__)
+
+PRIVATE_SUFFIX = "-private.pem"
+PUBLIC_SUFFIX = "-public.pem"
+
+
+def _public_key_bytes(key) -> bytes:
+    return key.public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+
+
+class JWTKeyring:
+    """
+    Parsed JWT signing and verification keys indexed by ``kid``.
+
+    Keys are read from ``<kid>-private.pem`` / ``<kid>-public.pem`` files in
+    ``keys_dir`` and parsed once into ``cryptography`` key objects. The
+    directory is rescanned at most every ``keyring_reload_seconds``, and
+    immediately (once per second at most) when a token names an unknown kid.
+    Rotation is therefore: add the new key pair, wait for the reload interval,
+    and remove the old private key once its tokens have expired.
+
+    A rescan that fails, e.g. on a key file that is still being written, keeps
+    the previous keys and is retried on the next check.
+    """
+
+    def __init__(self, config: AuthJWT):
+        self.config = config
+        self._private_keys: dict = {}
+        self._public_keys: dict = {}
+        self._active_kid: str | None = None
+        self._fingerprint: tuple = ()
+        self._checked_at = 0.0
+        self._forced_at = 0.0
+
+        self.reloads = 0
+        self.reload_failures = 0
+        # Called when a kid is removed or its public key is replaced
+        self.on_keys_changed: list[Callable[[], None]] = []
+
+    def _scan(self) -> tuple:
+        return tuple(sorted(
+            (path.name, path.stat().st_mtime_ns)
+            for path in Path(self.config.keys_dir).glob("*.pem")
+        ))
+
+    def load(self):
+        keys_dir = Path(self.config.keys_dir)
+        private_keys, public_keys, added = {}, {}, {}
+
+        for path in keys_dir.glob(f"*{PRIVATE_SUFFIX}"):
+            kid = path.name[:-len(PRIVATE_SUFFIX)]
+            private_keys[kid] = load_pem_private_key(path.read_bytes(), password=None)
+            public_keys[kid] = private_keys[kid].public_key()
+            added[kid] = path.stat().st_mtime_ns
+
+        for path in keys_dir.glob(f"*{PUBLIC_SUFFIX}"):
+            kid = path.name[:-len(PUBLIC_SUFFIX)]
+            public_keys[kid] = load_pem_public_key(path.read_bytes())
+
+        if self.config.active_kid:
+            active_kid = self.config.active_kid
+        elif added:
+            active_kid = max(added, key=added.get)
+        else:
+            active_kid = None
+
+        changed = {
+            kid for kid, key in self._public_keys.items()
+            if kid not in public_keys or _public_key_bytes(public_keys[kid]) != _public_key_bytes(key)
+        }
+
+        self._private_keys = private_keys
+        self._public_keys = public_keys
+        self._active_kid = active_kid
+        self._fingerprint = self._scan()
+        self._checked_at = time.monotonic()
+        self.reloads += 1
+
+        logger.info("Loaded JWT keys %s, signing with %r", sorted(public_keys), active_kid)
+
+        if changed:
+            for callback in self.on_keys_changed:
+                callback()
+
+    def maybe_reload(self, force: bool = False):
+        now = time.monotonic()
+        if force:
+            if now - self._forced_at < 1:
+                return
+            self._forced_at = now
+        elif now - self._checked_at < self.config.keyring_reload_seconds:
+            return
+
+        self._checked_at = now
+        try:
+            if self._scan() != self._fingerprint:
+                self.load()
+        except (OSError, ValueError, TypeError):
+            self.reload_failures += 1
+            logger.exception("Failed to reload JWT keys from %s, keeping the loaded keys", self.config.keys_dir)
+
+    def signing_key(self) -> tuple[str, object]:
+        self.maybe_reload()
+        key = self._private_keys.get(self._active_kid)
+        if key is None:
+            raise RuntimeError(f"No private key for the active JWT kid {self._active_kid!r}")
+        return self._active_kid, key
+
+    def verification_key(self, kid: str | None) -> object:
+        self.maybe_reload()
+        # Tokens issued before kid headers were added are checked with the active key
+        kid = kid or self._active_kid
+        if kid not in self._public_keys:
+            self.maybe_reload(force=True)
+        try:
+            return self._public_keys[kid]
+        except KeyError:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+
+    def kids(self) -> list[str]:
+        return sorted(self._public_keys)
+
+
+keyring = JWTKeyring(settings.auth_jwt)
+keyring.load()
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from sqlalchemy import insert
+
+from app.config import settings, AuditLog
+from app.database import sessionmanager
+from app.models.log import Log
+from app.utils.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink:
+    """
+    In-process buffer for ``service_logs`` rows.
+
+    Entries are appended to an in-memory buffer and written by a background
+    task as one multi-row INSERT, either when ``batch_size`` entries are pending
+    or every ``flush_interval`` seconds. Whatever is still buffered is written
+    by :meth:`close` on application shutdown.
+    """
+
+    def __init__(self, config: AuditLog):
+        self.config = config
+        self._buffer: list[dict] = []
+        # Not cancelled on close, so a flush in progress completes
+        self._task = PeriodicTask(
+            self.flush, config.flush_interval, "Audit log flush", run_at_start=False, cancel_on_close=False
+        )
+
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    def enqueue(self, entry: dict):
+        if len(self._buffer) >= self.config.max_buffer:
+            self.dropped += 1
+            return
+
+        self._buffer.append(entry)
+        self._task.start()
+
+        if len(self._buffer) >= self.config.batch_size:
+            self._task.wake()
+
+    def start(self):
+        self._task.start()
+
+    async def flush(self) -> int:
+        if not self._buffer:
+            return 0
+
+        batch, self._buffer = self._buffer, []
+        try:
+            async with sessionmanager.session() as session:
+                await session.execute(insert(Log), batch)
+                await session.commit()
+        except asyncio.CancelledError:
+            # Not written; keep the entries for the next flush
+            self._buffer[:0] = batch
+            raise
+        except Exception:
+            self.dropped += len(batch)
+            logger.exception("Failed to write %d audit log entries", len(batch))
+            return 0
+
+        self.flushes += 1
+        self.written += len(batch)
+        return len(batch)
+
+    async def close(self):
+        await self._task.close()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+
+log_sink = LogSink(settings.audit_log)
@@ -0,0 +1,212 @@
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings, LogPartitions
+from app.database import sessionmanager
+from app.utils.auth import utc_now
+from app.utils.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+TABLE = "service_logs"
+DEFAULT_PARTITION = "service_logs_default"
+PARTITION_NAME = re.compile(r"^service_logs_y(\d{4})m(\d{2})$")
+
+# Serializes partition DDL between workers running the maintenance job
+ADVISORY_LOCK_ID = 0x5E5_1065
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+async def get_log_partitions(db_session: AsyncSession) -> dict[date, str]:
+    """
+    Get the monthly partitions of ``service_logs``.
+
+    :param db_session: Asynchronous database session.
+
+    :return: Partition names by the first day of their month.
+    """
+    result = await db_session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": TABLE})
+
+    partitions = {}
+    for name in result.scalars():
+        if match := PARTITION_NAME.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def _execute_ddl(db_session: AsyncSession, template: str, name: str, bounds: dict[str, date]):
+    """
+    Run DDL built by PostgreSQL ``format()`` from a partition name and its bounds.
+
+    :param template: ``format()`` string, with ``%1$I`` for the name and ``%2$L`` / ``%3$L`` for the start and end.
+    """
+    ddl = await db_session.scalar(text(
+        "SELECT format(:template, CAST(:name AS text), CAST(:start AS date), CAST(:end AS date))"
+    ), {"template": template, "name": name, **bounds})
+    await db_session.execute(text(ddl))
+
+
+async def create_log_partition(db_session: AsyncSession, month: date) -> int:
+    """
+    Create the partition for one month in the current transaction.
+
+    The partition is built as a standalone table and then attached, which
+    takes a SHARE UPDATE EXCLUSIVE lock on ``service_logs`` instead of the
+    ACCESS EXCLUSIVE lock of ``CREATE TABLE ... PARTITION OF``, so inserts
+    into the other partitions go on. Rows of that month already in the
+    default partition are moved into the new table before it is attached.
+    Attaching still scans the default partition under an ACCESS EXCLUSIVE
+    lock on it, which retention keeps small.
+
+    :param db_session: Asynchronous database session.
+    :param month: First day of the month.
+
+    :return: Number of rows moved from the default partition.
+    """
+    bounds = {"start": month, "end": add_months(month, 1)}
+    name = partition_name(month)
+
+    await _execute_ddl(db_session, f"CREATE TABLE %1$I (LIKE {TABLE} INCLUDING DEFAULTS)", name, bounds)
+    result = await db_session.scalars(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created >= :start AND created < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved RETURNING id"
+    ), bounds)
+    moved = len(result.all())
+    if moved:
+        logger.warning(
+            "Moved %d rows from %s to the new partition %s", moved, DEFAULT_PARTITION, name,
+            extra={"partition": name, "moved": moved},
+        )
+
+    # Lets ATTACH skip scanning the new table for rows outside its bounds
+    await _execute_ddl(
+        db_session,
+        "ALTER TABLE %1$I ADD CONSTRAINT partition_bounds CHECK (created >= %2$L AND created < %3$L)",
+        name, bounds,
+    )
+    await _execute_ddl(
+        db_session, f"ALTER TABLE {TABLE} ATTACH PARTITION %1$I FOR VALUES FROM (%2$L) TO (%3$L)", name, bounds
+    )
+    await _execute_ddl(db_session, "ALTER TABLE %1$I DROP CONSTRAINT partition_bounds", name, bounds)
+    return moved
+
+
+async def maintain_log_partitions(
+        db_session: AsyncSession,
+        months_ahead: int,
+        retention_months: int,
+        today: date | None = None
+) -> tuple[list[str], list[str], int]:
+    """
+    Create missing partitions up to ``months_ahead`` months ahead and drop expired ones, then commit.
+
+    A partition is expired once its whole month is more than
+    ``retention_months`` months before the current month; it is dropped as a
+    table, without deleting rows one by one. Rows of those months left in the
+    default partition are deleted.
+
+    :param db_session: Asynchronous database session.
+    :param months_ahead: Number of future months to create partitions for.
+    :param retention_months: Number of past months to keep.
+    :param today: Current day; today in UTC when None.
+
+    :return: Names of the created and of the dropped partitions, and the number of rows deleted from the default one.
+    """
+    current = month_start(today or utc_now().date())
+    oldest_kept = add_months(current, -retention_months)
+
+    await db_session.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+    partitions = await get_log_partitions(db_session)
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in partitions:
+            await create_log_partition(db_session, month)
+            created.append(partition_name(month))
+
+    dropped = []
+    for month, name in sorted(partitions.items()):
+        if month < oldest_kept:
+            await db_session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    result = await db_session.scalars(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created < :cutoff RETURNING id"), {"cutoff": oldest_kept}
+    )
+    pruned = len(result.all())
+
+    await db_session.commit()
+    return created, dropped, pruned
+
+
+class LogPartitionMaintainer:
+    """
+    Background task that keeps ``service_logs`` partitioned by month.
+
+    It runs at startup and then every ``interval`` seconds, so partitions for
+    the coming months exist before the first row for them is written, and
+    partitions past the retention period are dropped.
+    """
+
+    def __init__(self, config: LogPartitions):
+        self.config = config
+        self._task = PeriodicTask(self.run_once, config.interval, "Log partition maintenance")
+
+        self.created = 0
+        self.dropped = 0
+        self.pruned = 0
+
+    def start(self):
+        if self.config.enabled:
+            self._task.start()
+
+    async def run_once(self) -> tuple[list[str], list[str], int]:
+        async with sessionmanager.session() as session:
+            created, dropped, pruned = await maintain_log_partitions(
+                session, self.config.months_ahead, self.config.retention_months
+            )
+
+        self.created += len(created)
+        self.dropped += len(dropped)
+        self.pruned += pruned
+        if created or dropped or pruned:
+            logger.info(
+                "Log partitions created: %s, dropped: %s, expired default partition rows deleted: %d",
+                created, dropped, pruned,
+                extra={"created": created, "dropped": dropped, "pruned": pruned},
+            )
+        return created, dropped, pruned
+
+    async def close(self):
+        await self._task.close()
+
+    def stats(self) -> dict:
+        return {
+            "created": self.created,
+            "dropped": self.dropped,
+            "pruned": self.pruned,
+            "failures": self._task.failures,
+        }
+
+
+log_partition_maintainer = LogPartitionMaintainer(settings.log_partitions)
@@ -0,0 +1,82 @@
+from app.database import sessionmanager
+from app.services.password import password_hasher
+from app.utils.metrics import registry, Counter, Gauge, Histogram, CallbackGauge
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ["method", "route", "status"]
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ["method", "route"]
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ["method"]
+))
+
+jwt_duration = registry.register(Histogram(
+    "jwt_operation_duration_seconds",
+    "Time spent signing and verifying JWTs; cached verifications are not included.",
+    ["operation"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+))
+
+
+def _pool_stats() -> dict:
+    return sessionmanager.pool_stats() if sessionmanager._engine is not None else {}
+
+
+def _pool_metric(name: str, documentation: str, key: str, type: str = "gauge"):
+    registry.register(CallbackGauge(
+        name,
+        documentation,
+        lambda: {(): stats[key]} if (stats := _pool_stats()) else {},
+        type=type,
+    ))
+
+
+_pool_metric("db_pool_size", "Configured size of the database connection pool.", "size")
+_pool_metric("db_pool_checked_out", "Database connections currently checked out.", "checked_out")
+_pool_metric("db_pool_overflow", "Database connections open beyond the pool size.", "overflow")
+_pool_metric("db_pool_checkouts_total", "Database connection checkouts.", "checkouts", "counter")
+_pool_metric(
+    "db_pool_checkout_timeouts_total", "Database connection checkouts that timed out.", "checkout_timeouts", "counter"
+)
+_pool_metric(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for database connections.", "wait_seconds", "counter"
+)
+_pool_metric(
+    "db_pool_checkout_wait_seconds_max", "Longest wait for a database connection.", "max_wait_seconds"
+)
+
+registry.register(CallbackGauge(
+    "db_replica_lag_seconds",
+    "Last measured replication lag of each read replica; +Inf when unreachable.",
+    lambda: {
+        (replica["name"],): replica["lag"] for replica in sessionmanager.replica_stats() if replica["lag"] is not None
+    },
+    ["replica"],
+))
+registry.register(CallbackGauge(
+    "db_replica_reads_total",
+    "Read sessions served by each read replica.",
+    lambda: {(replica["name"],): replica["reads"] for replica in sessionmanager.replica_stats()},
+    ["replica"],
+    type="counter",
+))
+registry.register(CallbackGauge(
+    "db_replica_fallbacks_total",
+    "Read sessions sent to the primary because no replica was within the lag threshold.",
+    lambda: {(): sessionmanager.replica_fallbacks},
+    type="counter",
+))
+
+registry.register(CallbackGauge(
+    "password_hash_queue_depth",
+    "Password hash and verify operations queued or running.",
+    lambda: {(): password_hasher.pending},
+))
+registry.register(CallbackGauge(
+    "password_hash_rejected_total",
+    "Password operations rejected because the queue was full.",
+    lambda: {(): password_hasher.rejected},
+    type="counter",
+))
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.config import settings, PasswordHashing
+from app.utils.auth import hash_password, verify_password
+
+
+class PasswordHasher:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt is deliberately slow, so running it on the event loop stalls every
+    other request on the worker. The pool runs it in threads (or processes) and
+    rejects new work once ``max_queue`` operations are pending, so a burst of
+    logins degrades into fast 503s instead of an ever-growing backlog.
+    """
+
+    def __init__(self, config: PasswordHashing):
+        self.config = config
+        self._executor: Executor | None = None
+
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.config.executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.config.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.pending >= self.config.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent password operations",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.config.executor,
+            "max_workers": self.config.max_workers,
+            "max_queue": self.config.max_queue,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "busy_seconds": self.busy_seconds,
+        }
+
+    def shutdown(self):
+        # Called from the lifespan, so don't block the event loop on running hashes
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.password_hashing)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash the password in the password worker pool.
+
+    :param password: The password to hash.
+
+    :returns: The hashed password.
+    :raises HTTPException: 503 if the pool queue is full.
+    """
+    return await password_hasher.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify the password in the password worker pool.
+
+    :param plain_password: The plain password to verify.
+    :param hashed_password: The hashed password to compare against.
+
+    :returns: True if the plain password matches the hashed password, False otherwise.
+    :raises HTTPException: 503 if the pool queue is full.
+    """
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
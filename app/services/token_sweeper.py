@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+from app.config import settings, TokenSweeper as TokenSweeperConfig
+from app.crud.auth import delete_expired_auth_tokens
+from app.crud.idempotency import delete_expired_idempotency_keys
+from app.database import sessionmanager
+from app.utils.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class TokenSweeper:
+    """
+    Background task that deletes expired rows from ``service_auth_tokens`` and ``idempotency_keys``.
+
+    Every ``interval`` seconds it deletes expired rows in transactions of at
+    most ``batch_size`` rows, pausing ``batch_pause`` seconds between them, so
+    row locks are held only briefly and the expiration indexes do the lookup.
+    """
+
+    def __init__(self, config: TokenSweeperConfig):
+        self.config = config
+        self._task = PeriodicTask(self.sweep, config.interval, "Expired token sweep")
+
+        self.runs = 0
+        self.removed = 0
+        self.last_removed = 0
+
+    def start(self):
+        if self.config.enabled:
+            self._task.start()
+
+    async def sweep(self) -> int:
+        """
+        Delete all currently expired tokens and idempotency keys, batch by batch.
+
+        :return: Number of deleted rows.
+        """
+        removed = 0
+        for delete_expired, name in (
+                (delete_expired_auth_tokens, "auth tokens"),
+                (delete_expired_idempotency_keys, "idempotency keys"),
+        ):
+            table_removed = await self._sweep(delete_expired)
+            if table_removed:
+                logger.info("Removed %d expired %s", table_removed, name, extra={"removed": table_removed})
+            removed += table_removed
+
+        self.runs += 1
+        self.removed += removed
+        self.last_removed = removed
+
+        return removed
+
+    async def _sweep(self, delete_expired) -> int:
+        removed = 0
+        while True:
+            async with sessionmanager.session() as session:
+                deleted = await delete_expired(session, self.config.batch_size)
+            removed += deleted
+
+            if deleted < self.config.batch_size:
+                return removed
+            await asyncio.sleep(self.config.batch_pause)
+
+    async def close(self):
+        await self._task.close()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "removed": self.removed,
+            "last_removed": self.last_removed,
+            "failures": self._task.failures,
+        }
+
+
+token_sweeper = TokenSweeper(settings.token_sweeper)
@@ -147,3 +147,19 @@ def is_protected_username(username: str):
 
     return username.lower() in usernames
 
+
+def parse_bearer_token(authorization: str | None) -> str | None:
+    """
+    Extract the token from an ``Authorization: Bearer <token>`` header value.
+
+    :param authorization: The header value, if the header was sent.
+    :returns: The token, or None if the header is missing or uses another scheme.
+    """
+    if not authorization:
+        return None
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+
+    return token.strip() or None
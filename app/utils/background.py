@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run a coroutine function every ``interval`` seconds on the running event loop.
+
+    :meth:`wake` triggers a run before the interval is over. :meth:`close`
+    either cancels a run in progress or, with ``cancel_on_close=False``, lets
+    it finish. Failures are logged and counted; they don't stop the task.
+
+    :param func: Coroutine function to run.
+    :param interval: Seconds between the end of a run and the start of the next.
+    :param name: Used in the failure log message.
+    :param run_at_start: Whether the first run starts right away instead of after ``interval``.
+    :param cancel_on_close: Whether :meth:`close` cancels a run in progress.
+    """
+
+    def __init__(
+            self,
+            func: Callable[[], Awaitable],
+            interval: float,
+            name: str,
+            run_at_start: bool = True,
+            cancel_on_close: bool = True
+    ):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self.run_at_start = run_at_start
+        self.cancel_on_close = cancel_on_close
+
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+
+        self.failures = 0
+
+    def start(self):
+        """
+        Start the task on the running loop, unless it's already running there.
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = loop.create_task(self._run())
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        wait = not self.run_at_start
+        while not self._stopping:
+            if wait:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if self._stopping:
+                    break
+            wait = True
+
+            try:
+                await self.func()
+            except Exception:
+                self.failures += 1
+                logger.exception("%s failed", self.name)
+
+    async def close(self):
+        if self._task is None:
+            return
+
+        # A task of another (closed) loop can't be awaited from this one
+        if self._task.get_loop() is asyncio.get_running_loop():
+            self._stopping = True
+            self.wake()
+            if self.cancel_on_close:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -0,0 +1,82 @@
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_listener: QueueListener | None = None
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Render a log record as one JSON object per line.
+
+    Values passed through ``extra`` are emitted as top-level fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str)
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Queue handler for an in-process listener: records are passed on as they
+    are and formatted in the listener thread instead of the caller's.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO"):
+    """
+    Route all log records through a queue to a stdout handler on a background thread.
+
+    Logging calls on the event loop only put the record on the queue; formatting
+    and writing happen in the listener thread. Calling it again is a no-op while
+    the listener is running.
+
+    :param level: Root logger level name.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(LocalQueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def shutdown_logging():
+    """
+    Stop the listener thread after writing every queued record.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,36 @@
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    :param values: Sort key values; they are serialized with ``str``.
+
+    :returns: URL-safe cursor string.
+    """
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers) -> tuple:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    :param cursor: The cursor string.
+    :param parsers: One callable per sort key value, e.g. ``datetime.fromisoformat``.
+
+    :returns: Parsed sort key values.
+    :raises HTTPException: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(parsers):
+            raise ValueError("cursor length mismatch")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
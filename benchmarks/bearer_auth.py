@@ -0,0 +1,104 @@
+"""
+Measure the per-request cost of carrying the access token in the session cookie
+versus an ``Authorization: Bearer`` header.
+
+Both cases run the same ASGI endpoint, which only reads the access token the
+way ``app.services.auth.get_access_token`` does:
+
+* ``cookie``: a signed session cookie holding an RS256 access token, handled
+  by ``SessionMiddleware`` (verify, decode, then re-sign and Set-Cookie);
+* ``bearer``: the same token in an Authorization header, handled by
+  ``BearerSessionMiddleware``, which skips the session cookie entirely.
+
+No database or network is involved, so the difference is the middleware cost
+alone. Results are printed as JSON in microseconds per request.
+
+Usage:
+    python -m benchmarks.bearer_auth --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from base64 import b64encode
+from uuid import uuid4
+
+import itsdangerous
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from app.api.middleware import BearerSessionMiddleware
+from app.constants import ACCESS_TOKEN_TYPE
+from app.services.auth import create_jwt, get_access_token
+
+SECRET_KEY = "some-random-string"
+
+
+async def endpoint(scope, receive, send):
+    token = get_access_token(Request(scope, receive))
+    await PlainTextResponse(token[:8])(scope, receive, send)
+
+
+def make_scope(headers: list[tuple[bytes, bytes]]) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/users/me",
+        "query_string": b"",
+        "headers": headers,
+    }
+
+
+async def run(app, headers: list[tuple[bytes, bytes]], requests: int) -> list[float]:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(make_scope(headers), receive, send)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "mean_us": round(statistics.fmean(timings), 2),
+        "p50_us": round(statistics.median(timings), 2),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1], 2),
+    }
+
+
+async def main(requests: int):
+    token = create_jwt(ACCESS_TOKEN_TYPE, {"sub": "bench@example.com", "refresh_token_id": str(uuid4())})
+
+    signer = itsdangerous.TimestampSigner(SECRET_KEY)
+    cookie = signer.sign(b64encode(json.dumps({"access_token": token}).encode())).decode()
+
+    cases = {
+        "cookie": (SessionMiddleware(endpoint, secret_key=SECRET_KEY), [(b"cookie", f"session={cookie}".encode())]),
+        "bearer": (BearerSessionMiddleware(endpoint, secret_key=SECRET_KEY),
+                   [(b"authorization", f"Bearer {token}".encode())]),
+    }
+
+    report = {"requests": requests, "token_bytes": len(token)}
+    for name, (app, headers) in cases.items():
+        await run(app, headers, min(requests, 1000))
+        report[name] = summarize(await run(app, headers, requests))
+
+    report["saving_us"] = round(report["cookie"]["mean_us"] - report["bearer"]["mean_us"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests))
@@ -0,0 +1,123 @@
+"""
+End-to-end load benchmark of the main API flows.
+
+Drives the application from ``app.main.get_application`` in process over ASGI
+against a throwaway PostgreSQL started by ``pytest-postgresql``. Each virtual
+user has its own cookie jar, like a browser, and the scenarios run one after
+another:
+
+* ``signup``: ``POST /auth/registration`` once per user;
+* ``login``: ``POST /auth/login`` once per user;
+* ``me``: ``GET /api/users/me`` ``--bench-iterations`` times per user;
+* ``refresh``: ``POST /auth/refresh`` once per user;
+* ``receipt``: ``POST /api/users/receipt`` ``--bench-iterations`` times per user;
+* ``receipt_bulk``: ``POST /api/users/receipt/bulk`` with three products and a
+  payment, ``--bench-iterations`` times per user.
+
+At most ``--bench-concurrency`` requests are in flight at once. For every
+scenario the report has throughput and p50/p95/p99 latency; it is printed as
+JSON and written to ``--bench-output`` if given, so runs can be diffed between
+releases.
+
+Usage:
+    pytest benchmarks/bench_load.py -o asyncio_mode=auto -s \\
+        --bench-users 50 --bench-concurrency 10 --bench-output bench.json
+"""
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+PASSWORD = "bench-password"
+
+BULK_RECEIPT = {
+    "products": [
+        {"title": "Coffee", "price": "2.50", "quantity": "2"},
+        {"title": "Croissant", "price": "1.80", "quantity": "1"},
+        {"title": "Water", "price": "0.90", "quantity": "3"},
+    ],
+    "payments": [{"payment_type": "card", "amount": "9.50"}],
+}
+
+Request = Callable[[httpx.AsyncClient, int, int], Awaitable[httpx.Response]]
+
+
+def percentile(timings: list[float], q: float) -> float:
+    return timings[max(int(len(timings) * q) - 1, 0)]
+
+
+def summarize(timings: list[float], errors: int, duration: float) -> dict:
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(timings) / duration, 1),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+async def run_scenario(
+        clients: list[httpx.AsyncClient],
+        request: Request,
+        iterations: int,
+        concurrency: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, errors = [], 0
+
+    async def send(user: int, iteration: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await request(clients[user], user, iteration)
+            timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        send(user, iteration) for iteration in range(iterations) for user in range(len(clients))
+    ))
+    return summarize(timings, errors, time.perf_counter() - start)
+
+
+SCENARIOS: list[tuple[str, Request, bool]] = [
+    ("signup", lambda client, user, _: client.post("/auth/registration", json={
+        "email": f"bench{user}@example.com", "username": f"bench_user_{user}", "password": PASSWORD,
+    }), False),
+    ("login", lambda client, user, _: client.post("/auth/login", json={
+        "email": f"bench{user}@example.com", "password": PASSWORD,
+    }), False),
+    ("me", lambda client, *_: client.get("/api/users/me"), True),
+    ("refresh", lambda client, *_: client.post("/auth/refresh"), False),
+    ("receipt", lambda client, *_: client.post("/api/users/receipt"), True),
+    ("receipt_bulk", lambda client, *_: client.post("/api/users/receipt/bulk", json=BULK_RECEIPT), True),
+]
+
+
+async def test_load(bench_app, bench_options, bench_report):
+    transport = httpx.ASGITransport(app=bench_app)
+    clients = [
+        httpx.AsyncClient(transport=transport, base_url="http://bench")
+        for _ in range(bench_options["users"])
+    ]
+
+    try:
+        for name, request, repeated in SCENARIOS:
+            iterations = bench_options["iterations"] if repeated else 1
+            bench_report["scenarios"][name] = await run_scenario(
+                clients, request, iterations, bench_options["concurrency"]
+            )
+    finally:
+        for client in clients:
+            await client.aclose()
+
+    failed = {name: result["errors"] for name, result in bench_report["scenarios"].items() if result["errors"]}
+    assert not failed, f"Requests failed: {failed}"
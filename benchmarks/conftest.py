@@ -0,0 +1,101 @@
+import json
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from pytest_postgresql import factories
+from pytest_postgresql.janitor import DatabaseJanitor
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.database import sessionmanager
+from app.main import get_application
+from app.models.base import Base
+
+
+bench_db = factories.postgresql_proc(
+    port=None,
+    dbname="bench_fast_poetry",
+)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("load benchmark")
+    group.addoption("--bench-users", type=int, default=50, help="Number of virtual users")
+    group.addoption("--bench-concurrency", type=int, default=10, help="Requests in flight at once")
+    group.addoption("--bench-iterations", type=int, default=20,
+                    help="Requests per user for the repeated scenarios (/me, receipts)")
+    group.addoption("--bench-driver", default="asyncpg", choices=["asyncpg", "psycopg"],
+                    help="SQLAlchemy driver used by the application")
+    group.addoption("--bench-output", default=None, help="Also write the JSON report to this file")
+
+
+@pytest.fixture(scope="session")
+def bench_options(request) -> dict:
+    return {
+        "users": request.config.getoption("--bench-users"),
+        "concurrency": request.config.getoption("--bench-concurrency"),
+        "iterations": request.config.getoption("--bench-iterations"),
+        "driver": request.config.getoption("--bench-driver"),
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_report(request, bench_options):
+    """
+    Scenario results collected by the benchmarks, printed and optionally written as JSON at the end of the run.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    report = {
+        "meta": {
+            **bench_options,
+            "commit": commit,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {},
+    }
+    yield report
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if path := request.config.getoption("--bench-output"):
+        Path(path).write_text(output + "\n")
+
+
+@pytest.fixture
+async def bench_app(bench_db, bench_options):
+    """
+    The real application from ``get_application`` with its lifespan running, on an empty database.
+    """
+    with DatabaseJanitor(
+            host=bench_db.host,
+            port=bench_db.port,
+            user=bench_db.user,
+            dbname=bench_db.dbname,
+            password=bench_db.password,
+            version=bench_db.version,
+    ):
+        url = (
+            f"postgresql+{bench_options['driver']}://{bench_db.user}:{bench_db.password}"
+            f"@{bench_db.host}:{bench_db.port}/{bench_db.dbname}"
+        )
+        app = get_application(url)
+
+        async with sessionmanager.connect() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        async with app.router.lifespan_context(app):
+            # Request logging would otherwise dominate the measurements
+            logging.getLogger().setLevel(logging.WARNING)
+            yield app
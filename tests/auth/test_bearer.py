@@ -0,0 +1,19 @@
+from fastapi.testclient import TestClient
+
+
+async def test_bearer_token_skips_session_cookie(app, client, register_user):
+    response = client.post("/auth/login", json={"email": "testuser@example.com", "password": "testpassword"})
+    access_token = response.json()["access_token"]
+
+    machine_client = TestClient(app)
+    response = machine_client.get("/api/users/me", headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "testuser@example.com"
+    assert "set-cookie" not in response.headers
+
+
+async def test_other_authorization_scheme_is_rejected(app, register_user):
+    response = TestClient(app).get("/api/users/me", headers={"Authorization": "Basic dGVzdDp0ZXN0"})
+
+    assert response.status_code == 401
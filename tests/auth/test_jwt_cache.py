@@ -0,0 +1,73 @@
+from datetime import timedelta
+import time
+
+import jwt
+import pytest
+
+import app.services.auth
+import app.utils.cache
+from app.services.auth import decode_jwt_cached, encode_jwt, jwt_payload_cache
+
+
+@pytest.fixture(autouse=True)
+def verifications(monkeypatch):
+    jwt_payload_cache.clear()
+    calls = []
+    decode_jwt = app.services.auth.decode_jwt
+
+    def counting_decode_jwt(token, *args, **kwargs):
+        calls.append(token)
+        return decode_jwt(token, *args, **kwargs)
+
+    monkeypatch.setattr(app.services.auth, "decode_jwt", counting_decode_jwt)
+    yield calls
+    jwt_payload_cache.clear()
+
+
+def test_cache_hit_skips_verification(verifications):
+    token = encode_jwt({"sub": "testuser@example.com"})
+
+    first = decode_jwt_cached(token)
+    second = decode_jwt_cached(token)
+
+    assert second is first
+    assert second["sub"] == "testuser@example.com"
+    assert len(verifications) == 1
+
+
+def test_cached_payload_expires_with_token(verifications, monkeypatch):
+    token = encode_jwt({"sub": "testuser@example.com"}, expire_timedelta=timedelta(seconds=30))
+    decode_jwt_cached(token)
+    now = time.monotonic()
+
+    monkeypatch.setattr(app.utils.cache.time, "monotonic", lambda: now + 25)
+    decode_jwt_cached(token)
+    assert len(verifications) == 1
+
+    monkeypatch.setattr(app.utils.cache.time, "monotonic", lambda: now + 35)
+    decode_jwt_cached(token)
+    assert len(verifications) == 2
+
+
+def test_expired_token_decoded_without_exp_check_is_not_cached(verifications):
+    token = encode_jwt({"sub": "testuser@example.com"}, expire_timedelta=timedelta(seconds=-10))
+
+    assert decode_jwt_cached(token, verify_exp=False)["sub"] == "testuser@example.com"
+    assert len(jwt_payload_cache) == 0
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_jwt_cached(token)
+    assert len(verifications) == 2
+
+
+def test_invalid_token_is_not_cached(verifications):
+    token = encode_jwt({"sub": "testuser@example.com"})
+    header, payload, signature = token.split(".")
+    tampered = f"{header}.{payload}.{signature[::-1]}"
+
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidTokenError):
+            decode_jwt_cached(tampered)
+
+    assert len(jwt_payload_cache) == 0
+    assert len(verifications) == 2
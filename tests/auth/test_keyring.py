@@ -0,0 +1,99 @@
+import os
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat, NoEncryption
+
+from app.config import AuthJWT
+from app.services.auth import encode_jwt, decode_jwt
+from app.services.keyring import JWTKeyring
+
+
+def write_key(keys_dir, kid: str, mtime_ns: int | None = None):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = keys_dir / f"{kid}-private.pem"
+    path.write_bytes(key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.fixture
+def keyring(tmp_path):
+    write_key(tmp_path, "old", 1_000_000_000)
+    keyring = JWTKeyring(AuthJWT(keys_dir=tmp_path, active_kid=None, keyring_reload_seconds=0))
+    keyring.load()
+    return keyring
+
+
+def sign(keyring: JWTKeyring) -> str:
+    kid, private_key = keyring.signing_key()
+    return jwt.encode({"sub": "testuser@example.com"}, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def verify(keyring: JWTKeyring, token: str) -> dict:
+    kid = jwt.get_unverified_header(token)["kid"]
+    return jwt.decode(token, keyring.verification_key(kid), algorithms=["RS256"])
+
+
+def test_tokens_name_their_signing_kid():
+    token = encode_jwt({"sub": "testuser@example.com"})
+
+    assert jwt.get_unverified_header(token)["kid"]
+    assert decode_jwt(token)["sub"] == "testuser@example.com"
+
+
+def test_rescan_signs_with_newest_key_and_verifies_old_tokens(keyring, tmp_path):
+    old_token = sign(keyring)
+
+    write_key(tmp_path, "new", 2_000_000_000)
+    new_token = sign(keyring)
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert keyring.kids() == ["new", "old"]
+    assert verify(keyring, old_token)["sub"] == "testuser@example.com"
+    assert verify(keyring, new_token)["sub"] == "testuser@example.com"
+
+
+def test_removed_key_no_longer_verifies(keyring, tmp_path):
+    changes = []
+    keyring.on_keys_changed.append(lambda: changes.append(keyring.kids()))
+    old_token = sign(keyring)
+    write_key(tmp_path, "new", 2_000_000_000)
+    keyring.maybe_reload()
+
+    (tmp_path / "old-private.pem").unlink()
+
+    with pytest.raises(jwt.InvalidTokenError):
+        verify(keyring, old_token)
+    assert changes == [["new"]]
+
+
+def test_replaced_key_under_same_kid_notifies(keyring, tmp_path):
+    changes = []
+    keyring.on_keys_changed.append(lambda: changes.append(keyring.kids()))
+    token = sign(keyring)
+
+    write_key(tmp_path, "old", 2_000_000_000)
+    keyring.maybe_reload()
+
+    assert changes == [["old"]]
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify(keyring, token)
+
+
+def test_half_written_key_keeps_loaded_keys(keyring, tmp_path):
+    token = sign(keyring)
+    path = write_key(tmp_path, "new", 2_000_000_000)
+    complete = path.read_bytes()
+    path.write_bytes(complete[:100])
+
+    assert verify(keyring, token)["sub"] == "testuser@example.com"
+    assert jwt.get_unverified_header(sign(keyring))["kid"] == "old"
+    assert keyring.reload_failures >= 1
+
+    path.write_bytes(complete)
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+
+    assert jwt.get_unverified_header(sign(keyring))["kid"] == "new"
@@ -1,3 +1,4 @@
+import logging
 
 
 async def test_login(client, register_user):
@@ -14,3 +15,18 @@ async def test_login(client, register_user):
     assert "refresh_token" in json_response
 
 
+async def test_login_invalid_password_is_logged_as_error(client, register_user, caplog):
+    login_data = {
+        "email": "testuser@example.com",
+        "password": "wrongpassword",
+    }
+
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        response = client.post("/auth/login", json=login_data)
+
+    assert response.status_code == 400
+    [record] = [record for record in caplog.records if record.name == "app.requests"]
+    assert record.levelname == "ERROR"
+    assert record.route == "/auth/login"
+    assert record.status_code == 400
+    assert record.exc_info is not None
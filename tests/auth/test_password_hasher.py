@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import PasswordHashing
+from app.services.password import PasswordHasher, password_hasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(PasswordHashing(executor="thread", max_workers=1, max_queue=2))
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_full_queue_is_rejected_with_503(hasher):
+    release = threading.Event()
+    running = [asyncio.ensure_future(hasher.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await hasher.run(lambda: None)
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+
+    release.set()
+    await asyncio.gather(*running)
+
+    assert await hasher.run(lambda: "ok") == "ok"
+    stats = hasher.stats()
+    assert stats["pending"] == 0
+    assert stats["peak_pending"] == 2
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 1
+    assert stats["max_queue"] == 2
+
+
+async def test_signup_returns_503_when_queue_is_full(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.config.max_queue)
+
+    response = client.post(
+        "/auth/registration",
+        json={"email": "testuser@example.com", "password": "testpassword", "username": "testuser"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+async def test_shutdown_does_not_wait_for_running_operations(hasher):
+    release = threading.Event()
+    running = asyncio.ensure_future(hasher.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    hasher.shutdown()
+
+    assert not running.done()
+    release.set()
+    await running
@@ -0,0 +1,29 @@
+from sqlalchemy import select
+
+from app.models import AuthToken
+
+
+async def test_login_and_refresh_rotate_token_in_place(client, register_user, test_session):
+    tokens = list(await test_session.scalars(select(AuthToken)))
+    assert len(tokens) == 1
+    token_id, secret_hash = tokens[0].id, tokens[0].secret_hash
+    assert len(secret_hash) == 64
+
+    response = client.post("/auth/login", json={"email": "testuser@example.com", "password": "testpassword"})
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh")
+    assert response.status_code == 200
+
+    test_session.expunge_all()
+    tokens = list(await test_session.scalars(select(AuthToken)))
+    assert [token.id for token in tokens] == [token_id]
+    assert tokens[0].secret_hash != secret_hash
+
+
+async def test_refresh_after_logout(client, register_user):
+    response = client.post("/auth/logout")
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh")
+    assert response.status_code == 401
@@ -2,10 +2,14 @@ import pytest
 import sys
 import os
 from pathlib import Path
+from fastapi import HTTPException
 from sqlalchemy import select
 
+from app.crud.user import check_user_unique, create_user
+from app.database import track_queries
 from app.models.user import User as DB_User
 from app.models.auth import AuthToken
+from app.schemas.auth import Signup
 
 
 # Тест для регистрации пользователя
@@ -72,3 +76,24 @@ async def test_signup_existed_email(client, register_user):
 
     json_response = response.json()
     assert "Email already exists" in json_response["detail"]
+
+
+async def test_signup_checks_uniqueness_with_one_query(client, test_session):
+    with track_queries() as stats:
+        await check_user_unique(test_session, "testuser", "testuser@example.com")
+
+    assert stats.queries == 1
+
+
+async def test_signup_race_is_caught_by_unique_index(client, register_user, test_session):
+    # Skips validate_signup, as a concurrent signup passing the check at the same time would
+    for signup, detail in [
+        (Signup(email="other@example.com", password="testpassword", username="TestUser"), "Username already exists"),
+        (Signup(email="TestUser@example.com", password="testpassword", username="otheruser"), "Email already exists"),
+    ]:
+        with pytest.raises(HTTPException) as error:
+            await create_user(test_session, signup)
+        await test_session.rollback()
+
+        assert error.value.status_code == 400
+        assert error.value.detail == detail
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from sqlalchemy import select, func
+
+from app.config import TokenSweeper as TokenSweeperConfig
+from app.crud.user import get_user_by_email
+from app.models import AuthToken
+from app.services.token_sweeper import TokenSweeper
+from app.utils.auth import utc_now
+
+
+async def test_sweeper_removes_expired_tokens_in_batches(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    now = utc_now()
+    for n in range(5):
+        test_session.add(AuthToken(
+            secret_hash=f"{n:064x}",
+            expiration=now - timedelta(days=n + 1),
+            created=now - timedelta(days=20),
+            token_type="refresh",
+            user_id=user.id,
+        ))
+    await test_session.commit()
+
+    sweeper = TokenSweeper(TokenSweeperConfig(batch_size=2, batch_pause=0))
+
+    assert await sweeper.sweep() == 5
+    assert sweeper.stats()["removed"] == 5
+    # The signup token has not expired
+    assert await test_session.scalar(select(func.count()).select_from(AuthToken)) == 1
+    assert await sweeper.sweep() == 0
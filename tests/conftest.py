@@ -18,6 +18,9 @@ from app.schemas.auth import Signup, LoginArgs
 from app.main import init_app
 from app.database import sessionmanager, get_db_session
 from app.models.user import User
+from app.crud.user import user_cache
+from app.crud.product import product_cache
+from app.services.idempotency import idempotency_store
 from app.utils.auth import hash_password, utc_now
 
 
@@ -86,11 +89,23 @@ async def create_tables(connection_test):
         await connection.run_sync(Base.metadata.create_all)
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    product_cache.clear()
+    idempotency_store.cache.clear()
+    yield
+    user_cache.clear()
+    product_cache.clear()
+    idempotency_store.cache.clear()
+
+
 @pytest.fixture(scope="function", autouse=True)
 async def session_override(app, connection_test):
     async def get_db_override():
         async with sessionmanager.session() as session:
             yield session
+            await session.commit()
 
     app.dependency_overrides[get_db_session] = get_db_override
 
@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import pytest
+from pytest_postgresql import factories
+from pytest_postgresql.janitor import DatabaseJanitor
+from sqlalchemy import text
+
+import app.database
+from app.config import DatabaseReplicas
+from app.database import DatabaseSessionManager, sessionmanager
+
+replica_db = factories.postgresql_proc(
+    port=None,
+    dbname="test_fast_poetry_replica",
+)
+
+
+@pytest.fixture(scope="module")
+def replica_url(replica_db):
+    with DatabaseJanitor(
+            host=replica_db.host,
+            port=replica_db.port,
+            user=replica_db.user,
+            dbname=replica_db.dbname,
+            password=replica_db.password,
+            version='16',
+    ):
+        yield f"postgresql+psycopg://{replica_db.user}:{replica_db.password}@{replica_db.host}:{replica_db.port}/{replica_db.dbname}"
+
+
+@pytest.fixture
+async def make_manager():
+    primary_url = sessionmanager._engine.url.render_as_string(hide_password=False)
+    managers = []
+
+    def make(urls: list[str], **replicas) -> DatabaseSessionManager:
+        manager = DatabaseSessionManager()
+        manager.init(primary_url, replicas=DatabaseReplicas(urls=urls, **replicas))
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        if manager._engine is not None:
+            await manager.close()
+
+
+async def current_database(manager: DatabaseSessionManager, read: bool = True) -> str:
+    async with (manager.read_session() if read else manager.session()) as session:
+        return await session.scalar(text("SELECT current_database()"))
+
+
+async def test_reads_go_to_replica(make_manager, replica_url):
+    manager = make_manager([replica_url])
+    await manager.check_replicas()
+
+    assert await current_database(manager) == "test_fast_poetry_replica"
+    assert await current_database(manager, read=False) == "test_fast_poetry"
+
+    [replica] = manager.replica_stats()
+    assert replica["reads"] == 1
+    assert replica["lag"] == 0
+    assert manager.replica_fallbacks == 0
+
+
+async def test_unchecked_replica_is_not_used(make_manager, replica_url):
+    manager = make_manager([replica_url])
+
+    assert await current_database(manager) == "test_fast_poetry"
+    assert manager.replica_fallbacks == 1
+    assert manager.replica_stats()[0]["lag"] is None
+
+
+async def test_lagging_replica_falls_back_to_primary(make_manager, replica_url, monkeypatch):
+    manager = make_manager([replica_url], max_lag=5)
+
+    monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT 30"))
+    await manager.check_replicas()
+    assert await current_database(manager) == "test_fast_poetry"
+    assert manager.replica_fallbacks == 1
+    assert manager.replica_stats()[0]["lag"] == 30
+
+    # Caught up again by the next check
+    monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT 1"))
+    await manager.check_replicas()
+    assert await current_database(manager) == "test_fast_poetry_replica"
+
+
+async def test_reads_use_the_last_measured_lag(make_manager, replica_url, monkeypatch):
+    manager = make_manager([replica_url], max_lag=5)
+    await manager.check_replicas()
+
+    async def query_lag():
+        raise AssertionError("Reads must not check the lag")
+
+    [replica] = manager._replicas
+    monkeypatch.setattr(replica, "_query_lag", query_lag)
+    assert await current_database(manager) == "test_fast_poetry_replica"
+    assert await current_database(manager) == "test_fast_poetry_replica"
+
+
+async def test_monitor_measures_lag_in_background(make_manager, replica_url, monkeypatch):
+    manager = make_manager([replica_url], max_lag=5, lag_check_interval=0.01)
+    [replica] = manager._replicas
+
+    manager.start_replica_monitor()
+    try:
+        for _ in range(200):
+            if replica.checked_at is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert await current_database(manager) == "test_fast_poetry_replica"
+
+        monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT 30"))
+        for _ in range(200):
+            if replica.lag == 30:
+                break
+            await asyncio.sleep(0.01)
+        assert await current_database(manager) == "test_fast_poetry"
+    finally:
+        # Stops the monitor on the loop it runs on
+        await manager.close()
+
+
+async def test_unreachable_replica_stays_out_of_rotation(make_manager, replica_url):
+    manager = make_manager(["postgresql+psycopg://postgres@127.0.0.1:1/missing", replica_url], failure_backoff=60)
+    await manager.check_replicas()
+    # Within the backoff the failed replica isn't checked again
+    await manager.check_replicas()
+
+    databases = {await current_database(manager) for _ in range(4)}
+
+    assert databases == {"test_fast_poetry_replica"}
+    unreachable, replica = manager.replica_stats()
+    assert unreachable["check_failures"] == 1
+    assert unreachable["reads"] == 0
+    assert replica["reads"] == 4
+
+
+async def test_failed_replica_is_checked_again_after_backoff(make_manager, replica_url, monkeypatch):
+    manager = make_manager([replica_url], failure_backoff=0)
+
+    monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT 1 / 0"))
+    await manager.check_replicas()
+    assert await current_database(manager) == "test_fast_poetry"
+
+    monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT 0"))
+    await manager.check_replicas()
+    assert await current_database(manager) == "test_fast_poetry_replica"
+
+
+async def test_slow_lag_check_times_out(make_manager, replica_url, monkeypatch):
+    manager = make_manager([replica_url], lag_check_timeout=0.2)
+
+    monkeypatch.setattr(app.database, "REPLICA_LAG_QUERY", text("SELECT pg_sleep(5)"))
+    started = time.monotonic()
+    await manager.check_replicas()
+
+    assert time.monotonic() - started < 2
+    assert manager.replica_stats()[0]["check_failures"] == 1
+    assert await current_database(manager) == "test_fast_poetry"
+
+
+async def test_reads_use_primary_without_replicas(make_manager):
+    manager = make_manager([])
+
+    assert await current_database(manager) == "test_fast_poetry"
+    assert manager.replica_stats() == []
+    assert manager.replica_fallbacks == 0
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+from sqlalchemy import insert, text
+
+from app.models import Log
+from app.services.log_partitions import maintain_log_partitions, get_log_partitions
+
+
+async def _partition_of(test_session, created: datetime) -> str:
+    return await test_session.scalar(
+        text("SELECT tableoid::regclass::text FROM service_logs WHERE created = :created"), {"created": created}
+    )
+
+
+async def test_maintenance_creates_and_drops_monthly_partitions(test_session):
+    stranded = datetime(2026, 11, 5, 12, 0)
+    await test_session.execute(insert(Log), [{"log_type": "me", "created": stranded, "data": {}}])
+    await test_session.commit()
+    assert await _partition_of(test_session, stranded) == "service_logs_default"
+
+    created, dropped, pruned = await maintain_log_partitions(
+        test_session, months_ahead=2, retention_months=1, today=date(2026, 10, 18)
+    )
+
+    assert created == ["service_logs_y2026m10", "service_logs_y2026m11", "service_logs_y2026m12"]
+    assert dropped == []
+    assert pruned == 0
+    assert await _partition_of(test_session, stranded) == "service_logs_y2026m11"
+
+    created, dropped, pruned = await maintain_log_partitions(
+        test_session, months_ahead=2, retention_months=1, today=date(2027, 1, 3)
+    )
+
+    assert created == ["service_logs_y2027m01", "service_logs_y2027m02", "service_logs_y2027m03"]
+    assert dropped == ["service_logs_y2026m10", "service_logs_y2026m11"]
+    assert pruned == 0
+    assert sorted((await get_log_partitions(test_session)).values()) == [
+        "service_logs_y2026m12", "service_logs_y2027m01", "service_logs_y2027m02", "service_logs_y2027m03"
+    ]
+    assert await _partition_of(test_session, stranded) is None
+
+
+async def test_retention_applies_to_default_partition(test_session):
+    expired, kept = datetime(2025, 1, 5, 12, 0), datetime(2026, 9, 15, 12, 0)
+    await test_session.execute(insert(Log), [
+        {"log_type": "me", "created": expired, "data": {}},
+        {"log_type": "me", "created": kept, "data": {}},
+    ])
+    await test_session.commit()
+
+    created, dropped, pruned = await maintain_log_partitions(
+        test_session, months_ahead=0, retention_months=1, today=date(2026, 10, 18)
+    )
+
+    assert pruned == 1
+    assert await _partition_of(test_session, expired) is None
+    assert await _partition_of(test_session, kept) == "service_logs_default"
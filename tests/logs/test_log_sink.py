@@ -0,0 +1,75 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import select, func
+
+from app.config import AuditLog
+from app.models import Log
+from app.services.log import LogSink
+from app.utils.auth import utc_now
+
+
+def entry(log_type: str = "me") -> dict:
+    return {"id": uuid4(), "created": utc_now(), "target_id": None, "log_type": log_type, "user_id": None, "data": {}}
+
+
+async def count_logs(test_session) -> int:
+    return await test_session.scalar(select(func.count()).select_from(Log))
+
+
+async def test_full_batch_is_written_without_waiting_for_interval(test_session):
+    sink = LogSink(AuditLog(batch_size=3, flush_interval=60, max_buffer=100))
+
+    for _ in range(3):
+        sink.enqueue(entry())
+    for _ in range(50):
+        if sink.written:
+            break
+        await asyncio.sleep(0.02)
+
+    assert sink.stats() == {"pending": 0, "written": 3, "dropped": 0, "flushes": 1}
+    assert await count_logs(test_session) == 3
+    await sink.close()
+
+
+async def test_entries_over_max_buffer_are_dropped(test_session):
+    sink = LogSink(AuditLog(batch_size=100, flush_interval=60, max_buffer=2))
+
+    for _ in range(3):
+        sink.enqueue(entry())
+
+    assert sink.stats()["pending"] == 2
+    assert sink.stats()["dropped"] == 1
+    await sink.close()
+    assert await count_logs(test_session) == 2
+
+
+async def test_close_drains_buffer_and_flush_in_progress(test_session):
+    sink = LogSink(AuditLog(batch_size=2, flush_interval=60, max_buffer=100))
+
+    # The first two entries wake the loop, the third is still buffered when close() is called
+    for _ in range(3):
+        sink.enqueue(entry())
+    await asyncio.sleep(0)
+    await sink.close()
+
+    assert sink.stats()["written"] == 3
+    assert sink.stats()["dropped"] == 0
+    assert await count_logs(test_session) == 3
+
+
+async def test_cancelled_flush_keeps_its_entries(test_session):
+    sink = LogSink(AuditLog(batch_size=100, flush_interval=60, max_buffer=100))
+    sink.enqueue(entry())
+
+    flush = asyncio.ensure_future(sink.flush())
+    await asyncio.sleep(0)
+    flush.cancel()
+    try:
+        await flush
+    except asyncio.CancelledError:
+        pass
+
+    assert sink.stats()["pending"] == 1
+    await sink.close()
+    assert await count_logs(test_session) == 1
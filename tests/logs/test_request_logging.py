@@ -0,0 +1,104 @@
+import json
+import logging
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware import RequestLoggingMiddleware
+from app.config import RequestLogging
+from app.utils.logging import JsonFormatter
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+async def unavailable(request):
+    return PlainTextResponse("down", status_code=503)
+
+
+async def broken(request):
+    raise ValueError("broken")
+
+
+def logging_client(sample_rate: float, route_sample_rates: dict[str, float] | None = None) -> TestClient:
+    config = RequestLogging(
+        sample_rate=sample_rate,
+        route_sample_rates=route_sample_rates or {},
+        query_budget=10,
+        route_query_budgets={},
+    )
+    app = Starlette(
+        routes=[Route("/ok", ok), Route("/unavailable", unavailable), Route("/broken", broken)],
+        middleware=[Middleware(RequestLoggingMiddleware, config=config)],
+    )
+    return TestClient(app)
+
+
+def request_records(caplog) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.name == "app.requests"]
+
+
+@pytest.fixture
+def caplog_requests(caplog):
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        yield caplog
+
+
+def test_successful_requests_are_sampled(caplog_requests):
+    client = logging_client(sample_rate=0, route_sample_rates={"/unavailable": 0})
+
+    assert client.get("/ok").status_code == 200
+
+    assert request_records(caplog_requests) == []
+
+
+def test_route_sample_rate_overrides_default(caplog_requests):
+    client = logging_client(sample_rate=0, route_sample_rates={"/ok": 1})
+
+    client.get("/ok")
+
+    [record] = request_records(caplog_requests)
+    assert record.levelname == "INFO"
+    assert record.route == "/ok"
+    assert record.status_code == 200
+
+
+def test_server_errors_and_exceptions_are_always_logged(caplog_requests):
+    client = logging_client(sample_rate=0)
+
+    assert client.get("/unavailable").status_code == 503
+    response = client.get("/broken")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "broken"}
+
+    unavailable_record, broken_record = request_records(caplog_requests)
+    assert unavailable_record.levelname == "INFO"
+    assert unavailable_record.status_code == 503
+    assert broken_record.levelname == "ERROR"
+    assert broken_record.route == "/broken"
+    assert broken_record.status_code == 400
+
+
+def test_json_formatter_emits_extra_fields():
+    try:
+        raise ValueError("broken")
+    except ValueError as exc:
+        record = logging.LogRecord("app.requests", logging.ERROR, __file__, 1, "request failed: %s", (exc,), None)
+        record.exc_info = (type(exc), exc, exc.__traceback__)
+    record.route = "/broken"
+    record.status_code = 400
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["level"] == "ERROR"
+    assert data["logger"] == "app.requests"
+    assert data["message"] == "request failed: broken"
+    assert data["route"] == "/broken"
+    assert data["status_code"] == 400
+    assert "ValueError: broken" in data["exc_info"]
+    assert set(data) == {"ts", "level", "logger", "message", "route", "status_code", "exc_info"}
@@ -0,0 +1,36 @@
+from app.utils.metrics import Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    assert histogram.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+async def test_metrics_endpoint(client, register_user):
+    assert client.get("/api/users/me").status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(line.startswith('http_requests_total{method="GET",route="/api/users/me",status="200"} ') for line in lines)
+    assert any(
+        line.startswith('http_request_duration_seconds_bucket{method="GET",route="/api/users/me",le="+Inf"} ')
+        for line in lines
+    )
+    assert any(line.startswith('jwt_operation_duration_seconds_count{operation="sign"} ') for line in lines)
+    assert 'http_requests_in_flight{method="GET"} 1' in lines
+    assert "password_hash_queue_depth 0" in lines
+    assert any(line.startswith("db_pool_checkouts_total ") for line in lines)
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from app.crud.product import product_cache
+from app.crud.user import invalidate_cached_user
+from app.models import User
+
+
+@pytest.fixture
+async def admin_client(client, register_user, test_session):
+    await test_session.execute(update(User).where(User.email == "testuser@example.com").values(role="admin"))
+    await test_session.commit()
+    invalidate_cached_user("testuser@example.com")
+    return client
+
+
+def _create_product(client, title: str, price: str) -> str:
+    response = client.post("/api/products", json={"title": title, "price": price})
+    assert response.status_code == 200, response.json()
+    return response.json()["id"]
+
+
+async def test_lines_snapshot_catalog_products(admin_client):
+    coffee_id = _create_product(admin_client, "Coffee", "2.50")
+    tea_id = _create_product(admin_client, "Tea", "1.00")
+    product_cache.clear()
+    misses = product_cache.misses
+
+    response = admin_client.post(
+        "/api/users/receipt/bulk",
+        json={
+            "products": [
+                {"product_id": coffee_id, "quantity": "2"},
+                {"product_id": tea_id, "quantity": "1"},
+                {"product_id": coffee_id, "quantity": "1"},
+                {"title": "Bag", "price": "0.10", "quantity": "1"},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.json()
+    assert Decimal(response.json()["total"]) == Decimal("8.60")
+    assert product_cache.misses - misses == 2
+
+    response = admin_client.patch(f"/api/products/{coffee_id}", json={"price": "3.00"})
+    assert response.status_code == 200
+
+    response = admin_client.get(f"/api/products/{coffee_id}")
+    assert Decimal(response.json()["price"]) == Decimal("3.00")
+
+    receipt_id = admin_client.post("/api/users/receipt").json()["id"]
+    response = admin_client.post(
+        "/api/users/product", json={"product_id": coffee_id, "quantity": "1", "receipt_id": receipt_id}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["title"] == "Coffee"
+    assert Decimal(response.json()["price"]) == Decimal("3.00")
+    assert response.json()["product_id"] == coffee_id
+
+
+async def test_line_for_unknown_product(client, register_user):
+    response = client.post(
+        "/api/users/receipt/bulk",
+        json={"products": [{"product_id": "ae897f62-de4f-4059-ae5f-f83e315f7c7d", "quantity": "1"}]},
+    )
+
+    assert response.status_code == 404
+
+
+async def test_catalog_writes_require_admin(client, register_user):
+    response = client.post("/api/products", json={"title": "Coffee", "price": "2.50"})
+
+    assert response.status_code == 401
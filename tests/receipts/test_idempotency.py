@@ -0,0 +1,196 @@
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, func, update
+
+import app.services.idempotency
+from app.config import TokenSweeper as TokenSweeperConfig
+from app.crud.idempotency import claim_idempotency_key
+
+from app.crud.sales_receipt import create_sales_receipt
+from app.crud.user import get_user_by_email
+from app.database import sessionmanager
+from app.models import SalesReceipt, IdempotencyKey
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.services.token_sweeper import TokenSweeper
+from app.utils.auth import utc_now
+
+
+async def test_receipt_retry_is_replayed(client, register_user, test_session):
+    headers = {"Idempotency-Key": "terminal-1-0001"}
+
+    first = client.post("/api/users/receipt", headers=headers)
+    retry = client.post("/api/users/receipt", headers=headers)
+    idempotency_store.cache.clear()
+    retry_from_table = client.post("/api/users/receipt", headers=headers)
+
+    assert first.status_code == retry.status_code == retry_from_table.status_code == 200
+    assert first.json() == retry.json() == retry_from_table.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert await test_session.scalar(select(func.count()).select_from(SalesReceipt)) == 1
+
+
+async def test_key_reused_for_different_line(client, register_user):
+    receipt_id = client.post("/api/users/receipt").json()["id"]
+    headers = {"Idempotency-Key": "terminal-1-0002"}
+    line = {"title": "Coffee", "price": "2.50", "quantity": "1", "receipt_id": receipt_id}
+
+    response = client.post("/api/users/product", json=line, headers=headers)
+    assert response.status_code == 200
+
+    response = client.post("/api/users/product", json={**line, "quantity": "2"}, headers=headers)
+    assert response.status_code == 422
+
+
+async def test_failed_request_releases_the_key(client, register_user, test_session):
+    headers = {"Idempotency-Key": "terminal-1-0008"}
+    line = {"title": "Coffee", "price": "2.50", "quantity": "1", "receipt_id": str(uuid4())}
+
+    assert client.post("/api/users/product", json=line, headers=headers).status_code == 404
+    # Not 409: the retry isn't blocked by the claim of the failed request
+    assert client.post("/api/users/product", json=line, headers=headers).status_code == 404
+    assert await test_session.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+
+
+async def test_in_flight_duplicate_waits_for_first(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return {"calls": calls}
+
+    async def request():
+        async with sessionmanager.session() as session:
+            result = await idempotency_store.run(
+                session, user.id, "terminal-1-0003", request_fingerprint("POST /test"), handler
+            )
+            await session.commit()
+        return result
+
+    results = await asyncio.gather(request(), request())
+
+    assert calls == 1
+    assert results == [({"calls": 1}, False), ({"calls": 1}, True)]
+
+
+async def test_write_and_response_are_committed_together(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    fingerprint = request_fingerprint("POST /api/users/receipt")
+
+    # The request dies before its commit: neither the receipt nor the response survive
+    async with sessionmanager.session() as session:
+        await idempotency_store.run(
+            session, user.id, "terminal-1-0004", fingerprint, lambda: create_sales_receipt(session, user.id)
+        )
+        await session.rollback()
+
+    assert idempotency_store.cache.get((user.id, "terminal-1-0004")) is None
+    assert await test_session.scalar(select(func.count()).select_from(SalesReceipt)) == 0
+    key = await test_session.scalar(select(IdempotencyKey).where(IdempotencyKey.key == "terminal-1-0004"))
+    assert key.response is None
+
+    # Once the abandoned claim expires, the retry writes the receipt exactly once
+    await test_session.execute(update(IdempotencyKey).values(expires_at=utc_now() - timedelta(seconds=1)))
+    await test_session.commit()
+    async with sessionmanager.session() as session:
+        body, replayed = await idempotency_store.run(
+            session, user.id, "terminal-1-0004", fingerprint, lambda: create_sales_receipt(session, user.id)
+        )
+        await session.commit()
+
+    assert replayed is False
+    assert await test_session.scalar(select(func.count()).select_from(SalesReceipt)) == 1
+
+
+async def test_write_outliving_its_claim_is_rejected(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    fingerprint = request_fingerprint("POST /test")
+
+    async def slow_handler():
+        # A retry takes the expired claim over while this request is still running
+        async with sessionmanager.session() as session:
+            await session.execute(update(IdempotencyKey).values(expires_at=utc_now() - timedelta(seconds=1)))
+            await session.commit()
+            assert await claim_idempotency_key(session, user.id, "terminal-1-0005", fingerprint, 30)
+        return {"ok": True}
+
+    async with sessionmanager.session() as session:
+        with pytest.raises(HTTPException) as error:
+            await idempotency_store.run(session, user.id, "terminal-1-0005", fingerprint, slow_handler)
+
+    assert error.value.status_code == 409
+
+
+async def test_failed_commit_releases_the_key(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    fingerprint = request_fingerprint("POST /api/users/receipt")
+
+    with pytest.raises(RuntimeError):
+        async with sessionmanager.session() as session:
+            await idempotency_store.run(
+                session, user.id, "terminal-1-0006", fingerprint, lambda: create_sales_receipt(session, user.id)
+            )
+            # The commit in get_db_session fails, e.g. on a serialization error
+            raise RuntimeError("commit failed")
+
+    assert await test_session.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+
+    # The retry runs right away instead of waiting for the claim to expire
+    async with sessionmanager.session() as session:
+        body, replayed = await idempotency_store.run(
+            session, user.id, "terminal-1-0006", fingerprint, lambda: create_sales_receipt(session, user.id)
+        )
+        await session.commit()
+
+    assert replayed is False
+    assert await test_session.scalar(select(func.count()).select_from(SalesReceipt)) == 1
+
+
+async def test_claim_uses_the_request_connection(register_user, test_session, monkeypatch):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    claims = []
+
+    async def claim(db_session, *args):
+        claims.append((db_session, sessionmanager.pool_stats()["checked_out"]))
+        return await claim_idempotency_key(db_session, *args)
+
+    monkeypatch.setattr(app.services.idempotency, "claim_idempotency_key", claim)
+
+    async def handler():
+        return {"ok": True}
+
+    async with sessionmanager.session() as session:
+        # The request session already holds a connection, e.g. after a user lookup
+        await get_user_by_email(session, "testuser@example.com")
+        checked_out = sessionmanager.pool_stats()["checked_out"]
+        await idempotency_store.run(session, user.id, "terminal-1-0007", request_fingerprint("POST /test"), handler)
+        await session.commit()
+
+    assert claims == [(session, checked_out)]
+
+
+async def test_sweeper_purges_expired_idempotency_keys(register_user, test_session):
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    now = utc_now()
+    for n, expires_at in enumerate([now - timedelta(hours=1), now - timedelta(minutes=1), now + timedelta(hours=1)]):
+        test_session.add(IdempotencyKey(
+            key=f"terminal-1-01{n:02d}",
+            fingerprint="0" * 64,
+            response={"n": n},
+            created_at=now - timedelta(days=1),
+            expires_at=expires_at,
+            user_id=user.id,
+        ))
+    await test_session.commit()
+
+    sweeper = TokenSweeper(TokenSweeperConfig(batch_size=1, batch_pause=0))
+
+    assert await sweeper.sweep() == 2
+    assert await test_session.scalar(select(func.count()).select_from(IdempotencyKey)) == 1
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from sqlalchemy import select, func
+
+from app.crud.sales_receipt import get_inconsistent_receipts
+from app.models import SalesReceiptProducts, Payment
+
+
+async def test_create_receipt_bulk(client, register_user, test_session):
+    receipt_data = {
+        "products": [
+            {"title": "Coffee", "price": "2.50", "quantity": "2"},
+            {"title": "Croissant", "price": "1.75", "quantity": "1"},
+        ],
+        "payments": [
+            {"payment_type": "cash", "amount": "10.00"},
+        ],
+    }
+
+    response = client.post("/api/users/receipt/bulk", json=receipt_data)
+    assert response.status_code == 200, response.json()
+
+    json_response = response.json()
+    assert Decimal(json_response["total"]) == Decimal("6.75")
+    assert Decimal(json_response["rest"]) == Decimal("3.25")
+    assert len(json_response["sales_receipt_products"]) == 2
+    assert len(json_response["payments"]) == 1
+
+    products_count = await test_session.scalar(
+        select(func.count()).select_from(SalesReceiptProducts)
+    )
+    payments_count = await test_session.scalar(select(func.count()).select_from(Payment))
+    assert products_count == 2
+    assert payments_count == 1
+
+
+async def test_create_receipt_bulk_rounds_line_totals(client, register_user, test_session):
+    # Each line is 0.125 before rounding: the receipt total is the sum of the rounded lines
+    receipt_data = {
+        "products": [
+            {"title": "Nails", "price": "0.25", "quantity": "0.5"},
+            {"title": "Screws", "price": "0.25", "quantity": "0.5"},
+        ],
+    }
+
+    response = client.post("/api/users/receipt/bulk", json=receipt_data)
+    assert response.status_code == 200, response.json()
+
+    json_response = response.json()
+    assert [Decimal(product["total"]) for product in json_response["sales_receipt_products"]] == [
+        Decimal("0.13"), Decimal("0.13")
+    ]
+    assert Decimal(json_response["total"]) == Decimal("0.26")
+    assert await get_inconsistent_receipts(test_session) == []
+
+
+async def test_create_receipt_bulk_requires_products(client, register_user):
+    response = client.post("/api/users/receipt/bulk", json={"products": []})
+
+    assert response.status_code == 422
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+
+async def test_export_receipts_ndjson(client, register_user):
+    for _ in range(2):
+        client.post(
+            "/api/users/receipt/bulk",
+            json={
+                "products": [{"title": "Coffee", "price": "2.50", "quantity": "2"}],
+                "payments": [{"payment_type": "cash", "amount": "5.00"}],
+            },
+        )
+
+    response = client.get("/api/users/receipts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    receipts = [json.loads(line) for line in response.text.splitlines()]
+    assert len(receipts) == 2
+    assert len(receipts[0]["sales_receipt_products"]) == 1
+    assert len(receipts[0]["payments"]) == 1
+
+
+async def test_export_receipts_csv(client, register_user):
+    client.post(
+        "/api/users/receipt/bulk",
+        json={
+            "products": [{"title": "Coffee", "price": "2.50", "quantity": "2"}],
+            "payments": [{"payment_type": "card", "amount": "5.00"}],
+        },
+    )
+
+    response = client.get("/api/users/receipts/export", params={"format": "csv"})
+    assert response.status_code == 200
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["record_type"] for row in rows] == ["receipt", "product", "payment"]
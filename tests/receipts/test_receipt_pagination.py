@@ -0,0 +1,42 @@
+async def test_list_receipts_pages_with_cursor(client, register_user):
+    created = [client.post("/api/users/receipt").json()["id"] for _ in range(3)]
+
+    response = client.get("/api/users/receipts", params={"limit": 2})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"]
+
+    response = client.get("/api/users/receipts", params={"limit": 2, "cursor": first_page["next_cursor"]})
+    second_page = response.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+
+    listed = [item["id"] for item in first_page["items"] + second_page["items"]]
+    assert sorted(listed) == sorted(created)
+
+
+async def test_list_receipt_products(client, register_user):
+    response = client.post(
+        "/api/users/receipt/bulk",
+        json={"products": [{"title": f"Item {i}", "price": "1.00", "quantity": "1"} for i in range(3)]},
+    )
+    receipt_id = response.json()["id"]
+
+    response = client.get(f"/api/users/receipts/{receipt_id}/products", params={"limit": 2})
+    first_page = response.json()
+    response = client.get(
+        f"/api/users/receipts/{receipt_id}/products",
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    second_page = response.json()
+
+    assert len(first_page["items"]) == 2
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+
+
+async def test_list_receipts_invalid_cursor(client, register_user):
+    response = client.get("/api/users/receipts", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+from app.crud.sales_receipt import get_inconsistent_receipts
+
+
+async def test_receipt_totals_follow_products_and_payments(client, register_user, test_session):
+    response = client.post("/api/users/receipt")
+    assert response.status_code == 200
+    receipt_id = response.json()["id"]
+
+    response = client.post(
+        "/api/users/product",
+        json={"title": "Coffee", "price": "2.50", "quantity": "2", "receipt_id": receipt_id},
+    )
+    assert response.status_code == 200, response.json()
+    assert Decimal(response.json()["total"]) == Decimal("5.00")
+
+    response = client.post(
+        "/api/users/payment",
+        json={"payment_type": "card", "amount": "6.00", "receipt_id": receipt_id},
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client.post(
+        "/api/users/receipt/bulk",
+        json={"products": [{"title": "Tea", "price": "1.00", "quantity": "3"}]},
+    )
+    assert response.status_code == 200
+
+    assert await get_inconsistent_receipts(test_session) == []
+
+
+async def test_add_product_to_unknown_receipt(client, register_user):
+    response = client.post(
+        "/api/users/product",
+        json={
+            "title": "Coffee",
+            "price": "2.50",
+            "quantity": "1",
+            "receipt_id": "ae897f62-de4f-4059-ae5f-f83e315f7c7d",
+        },
+    )
+
+    assert response.status_code == 404
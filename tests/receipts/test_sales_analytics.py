@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from app.crud.sales_rollup import rebuild_sales_rollups
+
+
+def _write_sales(client):
+    response = client.post("/api/users/receipt")
+    assert response.status_code == 200
+    receipt_id = response.json()["id"]
+
+    response = client.post(
+        "/api/users/product",
+        json={"title": "Coffee", "price": "2.50", "quantity": "2", "receipt_id": receipt_id},
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client.post(
+        "/api/users/payment",
+        json={"payment_type": "cash", "amount": "5.00", "receipt_id": receipt_id},
+    )
+    assert response.status_code == 200, response.json()
+
+    response = client.post(
+        "/api/users/receipt/bulk",
+        json={
+            "products": [{"title": "Tea", "price": "1.00", "quantity": "3"}],
+            "payments": [{"payment_type": "card", "amount": "3.00"}],
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+
+def _assert_sales(client):
+    response = client.get("/api/users/analytics/sales")
+    assert response.status_code == 200, response.json()
+
+    days = response.json()["days"]
+    assert len(days) == 1
+    day = days[0]
+    assert day["receipts_count"] == 2
+    assert day["products_count"] == 2
+    assert Decimal(day["total"]) == Decimal("8.00")
+    assert {
+        payment["payment_type"]: (payment["payments_count"], Decimal(payment["amount"]))
+        for payment in day["payments"]
+    } == {"cash": (1, Decimal("5.00")), "card": (1, Decimal("3.00"))}
+
+
+async def test_sales_analytics_follow_writes(client, register_user):
+    _write_sales(client)
+    _assert_sales(client)
+
+
+async def test_rebuild_sales_rollups(client, register_user, test_session):
+    _write_sales(client)
+
+    sales_rows, payment_rows = await rebuild_sales_rollups(test_session)
+
+    assert (sales_rows, payment_rows) == (1, 2)
+    _assert_sales(client)
@@ -0,0 +1,36 @@
+from sqlalchemy import text, update
+
+from app.crud.user import invalidate_cached_user
+from app.database import sessionmanager
+from app.models.user import User
+
+
+async def test_pool_stats_count_checkouts():
+    before = sessionmanager.pool_stats()
+
+    async with sessionmanager.session() as session:
+        await session.execute(text("SELECT 1"))
+        during = sessionmanager.pool_stats()
+
+    after = sessionmanager.pool_stats()
+    assert during["checked_out"] == before["checked_out"] + 1
+    assert after["checked_out"] == before["checked_out"]
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["checkout_timeouts"] == 0
+    assert after["wait_seconds"] >= before["wait_seconds"]
+
+
+async def test_db_pool_endpoint_is_admin_only(client, register_user, test_session):
+    response = client.get("/api/users/admin/db_pool")
+    assert response.status_code == 401
+
+    await test_session.execute(update(User).where(User.email == "testuser@example.com").values(role="admin"))
+    await test_session.commit()
+    invalidate_cached_user("testuser@example.com")
+
+    response = client.get("/api/users/admin/db_pool")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["checkouts"] >= 1
+    assert {"size", "checked_out", "overflow", "checkout_timeouts", "max_wait_seconds"} <= body.keys()
+    assert body["replicas"] == []
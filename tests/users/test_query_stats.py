@@ -0,0 +1,52 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware import RequestLoggingMiddleware
+from app.config import RequestLogging, parse_budgets
+from app.database import sessionmanager
+
+
+async def test_me_reports_server_timing(client, register_user):
+    response = client.get("/api/users/me")
+
+    assert response.status_code == 200
+    db_timing, app_timing = response.headers["Server-Timing"].split(", ")
+    assert db_timing.startswith("db;dur=")
+    assert db_timing.endswith('desc="1 queries"')
+    assert app_timing.startswith("app;dur=")
+
+
+async def test_requests_over_query_budget_are_flagged(caplog):
+    async def three_queries(request):
+        async with sessionmanager.session() as session:
+            for _ in range(3):
+                await session.execute(text("SELECT 1"))
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/three", three_queries)])
+    config = RequestLogging(sample_rate=0, route_sample_rates={}, query_budget=2, route_query_budgets={})
+
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        response = TestClient(RequestLoggingMiddleware(app, config)).get("/three")
+
+    assert response.status_code == 200
+    assert 'desc="3 queries"' in response.headers["Server-Timing"]
+    [record] = [record for record in caplog.records if record.name == "app.requests"]
+    assert record.levelname == "WARNING"
+    assert record.route == "/three"
+    assert record.db_queries == 3
+    assert record.over_query_budget is True
+
+
+def test_route_query_budgets_are_statement_counts():
+    assert parse_budgets("/api/users/receipts=4, /=0") == {"/api/users/receipts": 4, "/": 0}
+
+    for value in ("/api/users/receipts=5.5", "/api/users/receipts=-1", "/api/users/receipts="):
+        with pytest.raises(ValueError):
+            parse_budgets(value)
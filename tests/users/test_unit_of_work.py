@@ -0,0 +1,73 @@
+import logging
+
+from sqlalchemy import text
+
+import app.crud.user
+from app.crud.user import create_user, get_user_by_email
+from app.database import after_commit, sessionmanager
+from app.schemas.auth import Signup
+
+
+def request_record(caplog, path: str):
+    [record] = [record for record in caplog.records if record.name == "app.requests" and record.path == path]
+    return record
+
+
+async def test_write_routes_commit_once(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        response = client.post(
+            "/auth/registration",
+            json={"email": "testuser@example.com", "password": "testpassword", "username": "testuser"}
+        )
+        assert response.status_code == 200
+        response = client.post("/auth/login", json={"email": "testuser@example.com", "password": "testpassword"})
+        assert response.status_code == 200
+
+    assert request_record(caplog, "/auth/registration").db_commits == 1
+    assert request_record(caplog, "/auth/login").db_commits == 1
+
+
+async def test_failed_request_rolls_back_its_writes(client, register_user, test_session, monkeypatch):
+    check_user_unique = app.crud.user.check_user_unique
+
+    async def take_username_concurrently(db_session, username=None, email=None):
+        await check_user_unique(db_session, username, email)
+        # Another request takes the username after the check, before the update is flushed
+        async with sessionmanager.session() as session:
+            await create_user(
+                session, Signup(email="other@example.com", password="testpassword", username="renameduser")
+            )
+            await session.commit()
+
+    monkeypatch.setattr(app.crud.user, "check_user_unique", take_username_concurrently)
+    response = client.patch(
+        "/api/users/change/profile", json={"username": "RenamedUser", "email": "renamed@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already exists"
+
+    user = await get_user_by_email(test_session, "testuser@example.com")
+    assert user.username == "testuser"
+    assert await get_user_by_email(test_session, "renamed@example.com") is None
+
+    # The failed request returned its connection clean
+    monkeypatch.setattr(app.crud.user, "check_user_unique", check_user_unique)
+    response = client.patch("/api/users/change/profile", json={"email": "renamed@example.com"})
+    assert response.status_code == 200
+
+
+async def test_after_commit_callbacks(test_session):
+    called = []
+
+    await test_session.execute(text("SELECT 1"))
+    after_commit(test_session, lambda: called.append("rolled back"))
+    await test_session.rollback()
+
+    await test_session.execute(text("SELECT 1"))
+    after_commit(test_session, lambda: called.append("committed"))
+    assert called == []
+    await test_session.commit()
+
+    after_commit(test_session, lambda: called.append("outside a transaction"))
+
+    assert called == ["committed", "outside a transaction"]
@@ -0,0 +1,25 @@
+from app.crud.user import user_cache
+
+
+async def test_me_uses_user_cache(client, register_user):
+    response = client.get("/api/users/me")
+    assert response.status_code == 200
+
+    hits = user_cache.hits
+    response = client.get("/api/users/me")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "testuser@example.com"
+    assert user_cache.hits == hits + 1
+
+
+async def test_change_profile_invalidates_user_cache(client, register_user):
+    client.get("/api/users/me")
+    assert len(user_cache) == 1
+
+    response = client.patch("/api/users/change/profile", json={"username": "renameduser"})
+    assert response.status_code == 200
+    assert len(user_cache) == 0
+
+    response = client.get("/api/users/me")
+    assert response.json()["username"] == "renameduser"
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.utils.background import PeriodicTask
+
+
+async def test_runs_at_start_on_wake_and_survives_failures():
+    runs = []
+
+    async def func():
+        runs.append(len(runs))
+        if len(runs) == 1:
+            raise RuntimeError("first run fails")
+
+    task = PeriodicTask(func, interval=60, name="test task")
+    task.start()
+    await asyncio.sleep(0.01)
+    task.wake()
+    await asyncio.sleep(0.01)
+    await task.close()
+
+    assert runs == [0, 1]
+    assert task.failures == 1
+
+
+async def test_close_waits_for_run_in_progress_unless_cancelling():
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    for cancel_on_close, expected in ((False, [True]), (True, [])):
+        finished.clear()
+        task = PeriodicTask(slow, interval=60, name="test task", cancel_on_close=cancel_on_close)
+        task.start()
+        await asyncio.sleep(0.01)
+        await task.close()
+
+        assert finished == expected